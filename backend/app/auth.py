@@ -2,15 +2,20 @@
 Authentication module with OTP verification and JWT tokens.
 Supports both Supabase Auth (production) and demo mode (local dev).
 """
-from datetime import datetime, timedelta
-from typing import Optional, Dict
-from jose import JWTError, jwt
-from fastapi import HTTPException, status, Depends
+from functools import partial
+from typing import Optional
+from cachetools import TTLCache
+import jwt
+from jwt import InvalidTokenError as JWTError
+from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+import hashlib
+import hmac
 import logging
-import random
-import string
+import os
+import threading
+import time
 
 from app.config import settings
 
@@ -18,34 +23,76 @@ logger = logging.getLogger(__name__)
 
 # In-memory OTP storage (for demo mode and fallback)
 # In production with Supabase, their Auth handles OTP
-otp_store: Dict[str, dict] = {}
+# Bounded TTL cache so entries expire on their own instead of leaking;
+# eviction is O(1) and the 10-minute TTL replaces the manual expiry check.
+OTP_TTL_SECONDS = 600
+otp_store: TTLCache = TTLCache(maxsize=100_000, ttl=OTP_TTL_SECONDS)
+_otp_lock = threading.RLock()
+
+# Short-lived cache of decoded tokens so repeat requests skip the
+# signature verification + JSON parsing. Keyed by a token hash (never
+# the raw token). TTL is well below token lifetime, so a cached entry
+# can't meaningfully outlive its own expiry.
+_decode_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_decode_lock = threading.Lock()
+
+# Settings are immutable for the process lifetime; bind the values read on
+# every request to module-level names so the hot paths skip the attribute
+# lookups on the Settings instance.
+_DEMO_MODE = settings.DEMO_MODE
+_DEMO_OTP = settings.DEMO_OTP
+_OTP_HASH_KEY = settings.SECRET_KEY.encode()[:64]
+_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_DAYS * 86400
+
+# Bind key material and algorithm once instead of re-reading settings and
+# rebuilding the argument dicts on every token operation.
+_jwt_encode = partial(jwt.encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+_jwt_decode = partial(
+    jwt.decode,
+    key=settings.SECRET_KEY,
+    algorithms=[settings.ALGORITHM],
+    options={"require": ["exp", "sub"]},
+)
 
 security = HTTPBearer(auto_error=False)
 
 
 class TokenData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     phone: str
     supabase_uid: Optional[str] = None
 
 
 class OTPRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     phone: str
 
 
 class OTPVerify(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     phone: str
     otp: str
 
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str
     phone: str
 
 
 def generate_otp() -> str:
-    """Generate a 6-digit OTP."""
-    return ''.join(random.choices(string.digits, k=6))
+    """Generate a cryptographically random 6-digit OTP."""
+    return "%06d" % (int.from_bytes(os.urandom(4), "big") % 1_000_000)
+
+
+def _hash_otp(otp: str) -> bytes:
+    """Keyed hash of an OTP so the store never holds plaintext codes."""
+    return hashlib.blake2b(otp.encode(), digest_size=8, key=_OTP_HASH_KEY).digest()
 
 
 def send_otp(phone: str) -> dict:
@@ -55,18 +102,18 @@ def send_otp(phone: str) -> dict:
     - In production: Would use Supabase Auth or SMS provider
     """
     # Demo mode - use hardcoded OTP for all users
-    if settings.DEMO_MODE:
-        logger.info(f"[DEMO] OTP for {phone}: {settings.DEMO_OTP}")
+    if _DEMO_MODE:
+        logger.info(f"[DEMO] OTP for {phone}: {_DEMO_OTP}")
         return {"success": True, "message": "OTP sent successfully", "demo": True}
     
     # Production mode - generate and store OTP
     # In a real app, you'd send this via SMS (Twilio, etc.)
     otp = generate_otp()
-    otp_store[phone] = {
-        "otp": otp,
-        "created_at": datetime.utcnow(),
-        "attempts": 0
-    }
+    with _otp_lock:
+        otp_store[phone] = {
+            "otp_hash": _hash_otp(otp),
+            "attempts": 0
+        }
     
     # TODO: Integrate with SMS provider (Twilio, MSG91, etc.)
     logger.info(f"OTP generated for {phone} (SMS integration needed)")
@@ -77,100 +124,105 @@ def send_otp(phone: str) -> dict:
 def verify_otp(phone: str, otp: str) -> bool:
     """Verify OTP for a phone number."""
     # Demo mode - use hardcoded OTP for all users
-    if settings.DEMO_MODE:
-        return otp == settings.DEMO_OTP
-    
-    # Production mode - check stored OTP
-    stored = otp_store.get(phone)
-    if not stored:
-        return False
-    
-    # Check expiry (10 minutes)
-    if datetime.utcnow() - stored["created_at"] > timedelta(minutes=10):
-        del otp_store[phone]
-        return False
-    
-    # Check attempts (max 3)
-    if stored["attempts"] >= 3:
-        del otp_store[phone]
-        return False
-    
-    stored["attempts"] += 1
-    
-    if stored["otp"] == otp:
-        del otp_store[phone]  # Clear after successful verification
-        return True
+    if _DEMO_MODE:
+        return otp == _DEMO_OTP
     
+    # Production mode - check stored OTP (expiry is handled by the cache TTL)
+    with _otp_lock:
+        stored = otp_store.get(phone)
+        if not stored:
+            return False
+
+        # Check attempts (max 3)
+        if stored["attempts"] >= 3:
+            del otp_store[phone]
+            return False
+
+        stored["attempts"] += 1
+
+        if hmac.compare_digest(stored["otp_hash"], _hash_otp(otp)):
+            del otp_store[phone]  # Clear after successful verification
+            return True
+
     return False
 
 
 def create_access_token(phone: str, supabase_uid: Optional[str] = None) -> str:
     """Create JWT access token for authenticated user."""
-    expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
+    # exp is a Unix timestamp per the JWT spec; integer arithmetic avoids
+    # the datetime/timedelta objects the encoder would convert anyway.
     to_encode = {
         "sub": phone,
-        "exp": expire
+        "exp": int(time.time()) + _EXPIRE_SECONDS
     }
     if supabase_uid:
         to_encode["supabase_uid"] = supabase_uid
-    
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+
+    return _jwt_encode(to_encode)
 
 
 def decode_token(token: str) -> Optional[TokenData]:
     """Decode and validate JWT token."""
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _decode_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _jwt_decode(token)
         phone: str = payload.get("sub")
         if phone is None:
             return None
-        return TokenData(
+        token_data = TokenData(
             phone=phone,
             supabase_uid=payload.get("supabase_uid")
         )
+        with _decode_lock:
+            _decode_cache[cache_key] = token_data
+        return token_data
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
         return None
 
 
+async def _resolve_token(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Optional[TokenData]:
+    """
+    Resolve the bearer token once per request and cache the result on
+    request.state, so routes using both auth dependencies only decode once.
+    """
+    if hasattr(request.state, "token_data"):
+        return request.state.token_data
+
+    token_data = decode_token(credentials.credentials) if credentials else None
+    request.state.token_data = token_data
+    return token_data
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    token_data: Optional[TokenData] = Depends(_resolve_token)
 ) -> Optional[TokenData]:
     """
     Dependency to get current authenticated user from JWT token.
     Returns None if not authenticated (for optional auth).
     """
-    if credentials is None:
-        return None
-    
-    token = credentials.credentials
-    token_data = decode_token(token)
     return token_data
 
 
 async def require_auth(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    token_data: Optional[TokenData] = Depends(_resolve_token)
 ) -> TokenData:
     """
     Dependency that requires authentication.
     Raises 401 if not authenticated.
     """
-    if credentials is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    token = credentials.credentials
-    token_data = decode_token(token)
-    
     if token_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     return token_data
@@ -4,7 +4,7 @@ Loads settings from environment variables.
 """
 import os
 from functools import lru_cache
-from typing import List
+from typing import Tuple
 
 
 class Settings:
@@ -30,15 +30,15 @@ class Settings:
         "sqlite:///./wealth_advisor.db"
     )
     
-    # CORS - comma-separated list of allowed origins
-    CORS_ORIGINS: List[str] = [
-        origin.strip() 
+    # CORS - comma-separated list of allowed origins (immutable tuple)
+    CORS_ORIGINS: Tuple[str, ...] = tuple(
+        origin.strip()
         for origin in os.getenv(
-            "CORS_ORIGINS", 
+            "CORS_ORIGINS",
             "http://localhost:5173,http://localhost:3000,http://localhost:5000,https://wealth-advisor-hmadan24-gmailcoms-projects.vercel.app,https://wealth-advisor-six.vercel.app"
         ).split(",")
         if origin.strip()
-    ]
+    )
     
     # Demo mode - allows hardcoded OTP for all users
     DEMO_MODE: bool = os.getenv("DEMO_MODE", "true").lower() == "true"
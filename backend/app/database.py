@@ -2,14 +2,15 @@
 Database configuration and models using SQLAlchemy.
 Supports both SQLite (local dev) and PostgreSQL (Supabase/production).
 """
-from sqlalchemy import create_engine, Column, String, DateTime, Text
-from sqlalchemy.types import TypeDecorator, TEXT
+from sqlalchemy import create_engine, Column, String, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.mutable import MutableDict
 from datetime import datetime
-import json
+import orjson
 import os
+import zstandard
 
 from app.config import settings
 
@@ -20,34 +21,64 @@ DATABASE_URL = settings.DATABASE_URL
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# SQLite needs check_same_thread=False, PostgreSQL doesn't need it
-connect_args = {}
+# SQLite needs check_same_thread=False; for PostgreSQL (Supabase) configure
+# the pool explicitly: pre-ping drops stale connections after idle periods
+# instead of failing the first query, and recycling stays under Supabase's
+# server-side connection timeouts.
 if DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
-
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# zstd frame magic number - used to tell compressed rows from legacy ones
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
 class JSONEncodedDict(TypeDecorator):
-    """Enables JSON storage by encoding and decoding on the fly."""
-    impl = TEXT
+    """
+    JSON storage compressed with zstd on the fly (non-Postgres backends).
+
+    JSON compresses several-fold at level 3, cutting row size and the
+    bytes shuttled per read. Legacy rows written as plain JSON text are
+    still decoded transparently.
+    """
+    impl = LargeBinary
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
         if value is not None:
-            value = json.dumps(value)
+            value = zstandard.compress(orjson.dumps(value), level=3)
         return value
 
     def process_result_value(self, value, dialect):
-        if value is not None:
-            value = json.loads(value)
-        return value
+        if value is None:
+            return None
+        if isinstance(value, bytes) and value[:4] == _ZSTD_MAGIC:
+            return orjson.loads(zstandard.decompress(value))
+        # Legacy uncompressed rows (TEXT or raw JSON bytes)
+        return orjson.loads(value)
 
 
-# Use MutableDict to track changes to JSON
-MutableJSONDict = MutableDict.as_mutable(JSONEncodedDict)
+# On Postgres use native JSONB: the driver hands back an already-parsed dict
+# (no Python-side json.loads per read) and the column stays queryable
+# server-side. SQLite keeps the TEXT-encoded fallback.
+#
+# Note: there is deliberately no MutableDict wrapper here. Portfolios are
+# written atomically - callers must assign a fresh dict to portfolio_data
+# to mark the row dirty, instead of mutating the loaded dict in place.
+PortfolioJSON = JSONEncodedDict().with_variant(JSONB(none_as_null=True), "postgresql")
 
 
 class User(Base):
@@ -67,10 +98,18 @@ class Portfolio(Base):
     __tablename__ = "portfolios"
     
     id = Column(String(36), primary_key=True)  # UUID
-    phone = Column(String(15), index=True)
+    phone = Column(String(15))
     filename = Column(String(255))
     uploaded_at = Column(DateTime, default=datetime.utcnow)
-    portfolio_data = Column(MutableJSONDict)  # Stores the full parsed portfolio with mutation tracking
+    portfolio_data = Column(PortfolioJSON)  # Stores the full parsed portfolio (assign, don't mutate)
+
+    # "Latest portfolio for a phone" becomes a single index seek instead of
+    # an index scan on phone plus a sort on uploaded_at; the (phone, filename)
+    # index covers the master-row lookup every portfolio endpoint starts with.
+    __table_args__ = (
+        Index("ix_portfolios_phone_uploaded", "phone", uploaded_at.desc()),
+        Index("ix_portfolios_phone_filename", "phone", "filename"),
+    )
     
 
 # Create tables
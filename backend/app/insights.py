@@ -3,295 +3,547 @@ Portfolio Insights Engine
 
 Generates actionable insights and recommendations from portfolio data.
 """
-from typing import Dict, Any, List
+import hashlib
+import heapq
+import re
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from copy import deepcopy
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import orjson
+
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
 from app.rules_config import rules
 
+# Below this many holdings, plain fused loops are cheaper than building
+# NumPy arrays; above it, vectorized scans win.
+_VECTORIZE_MIN = 64
+
+
+# C-level accessors for fields the parsers always populate (both CAS and
+# US-equity holdings are built with every return field present).
+_get_pct_return = itemgetter("percentage_return")
+_get_abs_return = itemgetter("absolute_return")
+
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile a keyword list into a single alternation pattern."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+@lru_cache(maxsize=1024)
+def _fmt_inr(amount: int) -> str:
+    """Format a rupee amount, caching the grouped-digits string work."""
+    return f"₹{amount:,d}"
+
+
+# The rules config is immutable after startup; unpack the sections and the
+# frequently-read sub-rules once at import so the analyzers do local-name
+# loads instead of re-walking nested dicts on every request.
+_CONC_HIGH = rules.concentration["high"]
+_CONC_MODERATE = rules.concentration["moderate"]
+_DIV_OVER = rules.diversification["over_diversified"]
+_ALLOC_AGGRESSIVE = rules.asset_allocation["aggressive"]
+_ALLOC_CONSERVATIVE = rules.asset_allocation["conservative"]
+_ALLOC_BALANCED = rules.asset_allocation["balanced"]
+_OVERLAP_LARGE_CAP = rules.fund_overlap["large_cap"]
+_OVERLAP_FLEXI_CAP = rules.fund_overlap["flexi_cap"]
+_PERF_RULES = rules.performance
+_HS_PENALTIES = rules.health_score["penalties"]
+_HS_BONUSES = rules.health_score["bonuses"]
+
+# Grade thresholds flattened to a descending (min_score, grade, verdict)
+# table so grading is one short scan instead of nested dict lookups.
+_HS_GRADE_TABLE = tuple(sorted(
+    ((g["min_score"], grade, g["verdict"])
+     for grade, g in rules.health_score["grades"].items()),
+    reverse=True,
+))
+
+# Compile the overlap keyword lists once so each scheme name is scanned by
+# the C regex engine instead of one Python-level substring check per keyword.
+_LARGE_CAP_RE = _keyword_pattern(_OVERLAP_LARGE_CAP["keywords"])
+_FLEXI_CAP_RE = _keyword_pattern(_OVERLAP_FLEXI_CAP["keywords"])
+
+# Asset-class vocabulary for allocation bucketing: frozenset membership is
+# one hash probe instead of chained string comparisons.
+_EQUITY_CLASSES = frozenset(("equity", "us equity"))
+_DEBT_CLASSES = frozenset(("debt",))
+
+
+def _analyze_returns(pr, ar, under_thr, over_thr):
+    """Tally under/over-performer counts and summed absolute returns."""
+    under_count = 0
+    over_count = 0
+    total_loss = 0.0
+    total_gain = 0.0
+    for i in range(pr.shape[0]):
+        r = pr[i]
+        if r < under_thr:
+            under_count += 1
+            total_loss += ar[i]
+        elif r > over_thr:
+            over_count += 1
+            total_gain += ar[i]
+    return under_count, over_count, total_loss, total_gain
+
+
+# JIT the return scan to native code when numba is installed; the eager
+# signature compiles at import and cache=True persists the artifact so the
+# cold-compile cost is paid once per deployment, not per process. Without
+# numba the vectorized NumPy masks in analyze_performance are used instead.
+if _njit is not None:
+    _analyze_returns = _njit(
+        "Tuple((int64, int64, float64, float64))"
+        "(float64[:], float64[:], float64, float64)",
+        cache=True,
+        fastmath=True,
+    )(_analyze_returns)
+else:
+    _analyze_returns = None
+
+
+def _columnize(holdings: List[Dict]) -> Dict[str, tuple]:
+    """
+    Convert the holdings list-of-dicts into parallel columns in a single
+    pass, so the analyzers scan homogeneous sequences instead of hitting
+    the dict machinery per field per holding.
+    """
+    if not holdings:
+        return {
+            "scheme_name": (),
+            "current_value": (),
+            "percentage_return": (),
+            "absolute_return": (),
+            "asset_class": (),
+        }
+
+    names, values, pct_returns, abs_returns, classes = zip(*(
+        (
+            h.get("scheme_name", ""),
+            h.get("current_value", 0),
+            _get_pct_return(h),
+            _get_abs_return(h),
+            h.get("asset_class", ""),
+        )
+        for h in holdings
+    ))
+    return {
+        "scheme_name": names,
+        "current_value": values,
+        "percentage_return": pct_returns,
+        "absolute_return": abs_returns,
+        "asset_class": classes,
+    }
+
+
+# Fixed-shape records for emitted risks/actionables: cheaper to allocate
+# than per-record dicts and read by attribute downstream. Converted back
+# to dicts via _asdict() only at the JSON/storage boundary.
+Risk = namedtuple("Risk", ["type", "severity", "title", "description", "recommendation"])
+Actionable = namedtuple("Actionable", ["priority", "action", "description", "impact"])
+
+
+@dataclass
+class InsightBuckets:
+    """Shared output lists the analyzers append into directly."""
+    summary_insights: List[Dict] = field(default_factory=list)
+    actionables: List[Dict] = field(default_factory=list)
+    risks: List[Dict] = field(default_factory=list)
+    opportunities: List[Dict] = field(default_factory=list)
+
+
+# Lazily-built result for the empty-portfolio case; every empty portfolio
+# produces the same insights, so the pipeline runs for it at most once.
+_EMPTY_INSIGHTS: Optional[Dict[str, Any]] = None
+
+# Insights are a pure function of the portfolio payload, and dashboards
+# re-request them far more often than portfolios change. Bounded LRU keyed
+# by a content hash of the analyzer inputs; hits skip the whole pipeline.
+_INSIGHTS_CACHE: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_INSIGHTS_CACHE_MAX = 256
+_insights_cache_lock = threading.Lock()
+
+
+def _portfolio_cache_key(holdings) -> Optional[bytes]:
+    """
+    Stable content hash of the holdings, or None if unhashable.
+
+    Summary and allocations are recomputed deterministically from the
+    holdings on every mutation, so hashing the holdings alone is
+    sufficient and lets byte-identical re-uploads hit the cache.
+    """
+    try:
+        payload = orjson.dumps(holdings, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
 
 def generate_insights(portfolio: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate insights and actionable recommendations from portfolio data.
     """
-    insights = {
-        "summary_insights": [],
-        "actionables": [],
-        "risks": [],
-        "opportunities": [],
-    }
-    
     holdings = portfolio.get("holdings", [])
     asset_allocation = portfolio.get("asset_allocation", [])
     summary = portfolio.get("summary", {})
-    
+
+    # Empty portfolios (onboarding, fresh accounts) short-circuit to a
+    # cached result; callers get a fresh copy since insights are stored
+    # alongside the portfolio and may be mutated downstream.
+    if not holdings and not asset_allocation and summary.get("total_value", 0) == 0:
+        global _EMPTY_INSIGHTS
+        if _EMPTY_INSIGHTS is None:
+            _EMPTY_INSIGHTS = _build_insights(holdings, asset_allocation, summary, portfolio)
+        return deepcopy(_EMPTY_INSIGHTS)
+
+    key = _portfolio_cache_key(holdings)
+    if key is not None:
+        with _insights_cache_lock:
+            cached = _INSIGHTS_CACHE.get(key)
+            if cached is not None:
+                _INSIGHTS_CACHE.move_to_end(key)
+        if cached is not None:
+            return deepcopy(cached)
+
+    insights = _build_insights(holdings, asset_allocation, summary, portfolio)
+
+    if key is not None:
+        with _insights_cache_lock:
+            # Cache a private copy so caller-side mutation can't poison it
+            _INSIGHTS_CACHE[key] = deepcopy(insights)
+            if len(_INSIGHTS_CACHE) > _INSIGHTS_CACHE_MAX:
+                _INSIGHTS_CACHE.popitem(last=False)
+
+    return insights
+
+
+def _build_insights(
+    holdings: List[Dict],
+    asset_allocation: List[Dict],
+    summary: Dict,
+    portfolio: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Run the full analyzer pipeline over one portfolio."""
+    # Analyzers append straight into the shared buckets; no per-analyzer
+    # result dicts or extend() copies
+    out = InsightBuckets()
+
+    # Convert holdings to columns once; every analyzer reads these
+    cols = _columnize(holdings)
+
     # 1. Portfolio Concentration Analysis
-    concentration_insights = analyze_concentration(holdings, summary)
-    insights["risks"].extend(concentration_insights.get("risks", []))
-    insights["actionables"].extend(concentration_insights.get("actionables", []))
-    
+    analyze_concentration(cols, summary, out)
+
     # 2. Asset Allocation Analysis
-    allocation_insights = analyze_asset_allocation(asset_allocation)
-    insights["summary_insights"].extend(allocation_insights.get("summary", []))
-    insights["actionables"].extend(allocation_insights.get("actionables", []))
-    
+    analyze_asset_allocation(asset_allocation, out)
+
     # 3. Performance Analysis
-    performance_insights = analyze_performance(holdings)
-    insights["summary_insights"].extend(performance_insights.get("summary", []))
-    insights["opportunities"].extend(performance_insights.get("opportunities", []))
-    
+    analyze_performance(cols, out)
+
     # 4. Fund Overlap Detection
-    overlap_insights = detect_fund_overlap(holdings)
-    insights["risks"].extend(overlap_insights.get("risks", []))
-    insights["actionables"].extend(overlap_insights.get("actionables", []))
-    
-    # 5. Portfolio Health Score
-    insights["health_score"] = calculate_health_score(insights, portfolio)
-    
-    return insights
+    detect_fund_overlap(cols, out)
+
+    # 5. Portfolio Health Score (reads the records by attribute)
+    health_score = calculate_health_score(out, portfolio)
+
+    # Materialize the records as plain dicts only at the JSON/storage boundary
+    return {
+        "summary_insights": out.summary_insights,
+        "actionables": [a._asdict() for a in out.actionables],
+        "risks": [r._asdict() for r in out.risks],
+        "opportunities": out.opportunities,
+        "health_score": health_score,
+    }
 
 
-def analyze_concentration(holdings: List[Dict], summary: Dict) -> Dict[str, List]:
+def analyze_concentration(cols: Dict[str, tuple], summary: Dict, out: InsightBuckets) -> None:
     """Analyze portfolio concentration risks."""
-    risks = []
-    actionables = []
-    
+    risks = out.risks
+    actionables = out.actionables
+
     total_value = summary.get("total_value", 0)
     if total_value == 0:
-        return {"risks": risks, "actionables": actionables}
-    
-    # Get concentration rules from config
-    conc_rules = rules.concentration
-    
-    # Check top holding concentration
-    if holdings:
-        top_holding = holdings[0]
-        top_concentration = (top_holding["current_value"] / total_value)
-        
-        if top_concentration > conc_rules["high"]["threshold"]:
-            high_rule = conc_rules["high"]
-            risks.append({
-                "type": "high_concentration",
-                "severity": high_rule["severity"],
-                "title": high_rule["title"],
-                "description": high_rule["description_template"].format(
-                    fund_name=top_holding['scheme_name'][:40],
+        return
+
+    # Check top holding concentration; O(N) max instead of assuming the
+    # holdings arrived sorted by value
+    values = cols["current_value"]
+    if values:
+        top_idx = max(range(len(values)), key=values.__getitem__)
+        top_value = values[top_idx]
+        top_name = cols["scheme_name"][top_idx]
+        top_concentration = (top_value / total_value)
+
+        if top_concentration > _CONC_HIGH["threshold"]:
+            high_rule = _CONC_HIGH
+            risks.append(Risk(
+                type="high_concentration",
+                severity=high_rule["severity"],
+                title=high_rule["title"],
+                description=high_rule["description_fmt"](
+                    fund_name=top_name[:40],
                     percentage=top_concentration * 100
                 ),
-                "recommendation": high_rule["recommendation"]
-            })
-        elif top_concentration > conc_rules["moderate"]["threshold"]:
-            mod_rule = conc_rules["moderate"]
-            risks.append({
-                "type": "moderate_concentration",
-                "severity": mod_rule["severity"],
-                "title": mod_rule["title"],
-                "description": mod_rule["description_template"].format(
+                recommendation=high_rule["recommendation"]
+            ))
+        elif top_concentration > _CONC_MODERATE["threshold"]:
+            mod_rule = _CONC_MODERATE
+            risks.append(Risk(
+                type="moderate_concentration",
+                severity=mod_rule["severity"],
+                title=mod_rule["title"],
+                description=mod_rule["description_fmt"](
                     percentage=top_concentration * 100
                 ),
-                "recommendation": mod_rule["recommendation"]
-            })
+                recommendation=mod_rule["recommendation"]
+            ))
     
     # Check if portfolio is too fragmented
-    div_rules = rules.diversification
     scheme_count = summary.get("scheme_count", 0)
-    over_div = div_rules["over_diversified"]
+    over_div = _DIV_OVER
     
     if scheme_count > over_div["threshold"]:
-        risks.append({
-            "type": "over_diversification",
-            "severity": over_div["severity"],
-            "title": over_div["title"],
-            "description": over_div["description_template"].format(count=scheme_count),
-            "recommendation": over_div["recommendation"]
-        })
-        actionables.append({
-            "priority": over_div["actionable"]["priority"],
-            "action": over_div["actionable"]["action"],
-            "description": over_div["actionable"]["description_template"].format(count=scheme_count),
-            "impact": over_div["actionable"]["impact"]
-        })
-    
-    return {"risks": risks, "actionables": actionables}
+        risks.append(Risk(
+            type="over_diversification",
+            severity=over_div["severity"],
+            title=over_div["title"],
+            description=over_div["description_fmt"](count=scheme_count),
+            recommendation=over_div["recommendation"]
+        ))
+        actionables.append(Actionable(
+            priority=over_div["actionable"]["priority"],
+            action=over_div["actionable"]["action"],
+            description=over_div["actionable"]["description_fmt"](count=scheme_count),
+            impact=over_div["actionable"]["impact"]
+        ))
 
 
-def analyze_asset_allocation(allocation: List[Dict]) -> Dict[str, List]:
+def analyze_asset_allocation(allocation: List[Dict], out: InsightBuckets) -> None:
     """Analyze asset allocation and provide recommendations."""
-    summary = []
-    actionables = []
-    
+    summary = out.summary_insights
+    actionables = out.actionables
+
     equity_pct = 0
     debt_pct = 0
     
     for asset in allocation:
         asset_class = asset.get("asset_class", "").lower()
-        pct = asset.get("percentage", 0)
-        
+
         # Include both Indian equity and US equity in total equity calculation
-        if asset_class in ["equity", "us equity"]:
-            equity_pct += pct
-        elif asset_class == "debt":
-            debt_pct += pct
+        if asset_class in _EQUITY_CLASSES:
+            equity_pct += asset.get("percentage", 0)
+        elif asset_class in _DEBT_CLASSES:
+            debt_pct += asset.get("percentage", 0)
     
-    # Get asset allocation rules from config
-    alloc_rules = rules.asset_allocation
     equity_ratio = equity_pct / 100
-    
+
     # Asset allocation insights
-    if equity_ratio > alloc_rules["aggressive"]["equity_threshold"]:
-        agg_rule = alloc_rules["aggressive"]
+    if equity_ratio > _ALLOC_AGGRESSIVE["equity_threshold"]:
+        agg_rule = _ALLOC_AGGRESSIVE
         summary.append({
             "type": "allocation",
             "title": agg_rule["title"],
-            "description": agg_rule["description_template"].format(percentage=equity_pct)
+            "description": agg_rule["description_fmt"](percentage=equity_pct)
         })
-        actionables.append({
-            "priority": agg_rule["actionable"]["priority"],
-            "action": agg_rule["actionable"]["action"],
-            "description": agg_rule["actionable"]["description"],
-            "impact": agg_rule["actionable"]["impact"]
-        })
-    elif equity_ratio < alloc_rules["conservative"]["equity_threshold"]:
-        cons_rule = alloc_rules["conservative"]
+        actionables.append(Actionable(
+            priority=agg_rule["actionable"]["priority"],
+            action=agg_rule["actionable"]["action"],
+            description=agg_rule["actionable"]["description"],
+            impact=agg_rule["actionable"]["impact"]
+        ))
+    elif equity_ratio < _ALLOC_CONSERVATIVE["equity_threshold"]:
+        cons_rule = _ALLOC_CONSERVATIVE
         summary.append({
             "type": "allocation",
             "title": cons_rule["title"],
-            "description": cons_rule["description_template"].format(percentage=equity_pct)
-        })
-        actionables.append({
-            "priority": cons_rule["actionable"]["priority"],
-            "action": cons_rule["actionable"]["action"],
-            "description": cons_rule["actionable"]["description"],
-            "impact": cons_rule["actionable"]["impact"]
+            "description": cons_rule["description_fmt"](percentage=equity_pct)
         })
+        actionables.append(Actionable(
+            priority=cons_rule["actionable"]["priority"],
+            action=cons_rule["actionable"]["action"],
+            description=cons_rule["actionable"]["description"],
+            impact=cons_rule["actionable"]["impact"]
+        ))
     else:
-        bal_rule = alloc_rules["balanced"]
+        bal_rule = _ALLOC_BALANCED
         summary.append({
             "type": "allocation",
             "title": bal_rule["title"],
-            "description": bal_rule["description_template"].format(
+            "description": bal_rule["description_fmt"](
                 equity_pct=equity_pct,
                 debt_pct=debt_pct
             )
         })
-    
-    return {"summary": summary, "actionables": actionables}
 
 
-def analyze_performance(holdings: List[Dict]) -> Dict[str, List]:
+def analyze_performance(cols: Dict[str, tuple], out: InsightBuckets) -> None:
     """Analyze fund performance and identify opportunities."""
-    summary = []
-    opportunities = []
-    
-    # Get performance rules from config
-    perf_rules = rules.performance
-    
-    # Find underperformers and outperformers
-    underperformers = [h for h in holdings if h.get("percentage_return", 0) < perf_rules["underperformer_threshold"]]
-    outperformers = [h for h in holdings if h.get("percentage_return", 0) > perf_rules["strong_performer_threshold"] * 100]
-    
-    if underperformers:
-        total_loss = sum(h.get("absolute_return", 0) for h in underperformers)
+    summary = out.summary_insights
+    opportunities = out.opportunities
+
+    perf_rules = _PERF_RULES
+
+    pct_returns = cols["percentage_return"]
+    abs_returns = cols["absolute_return"]
+    n = len(pct_returns)
+    if n == 0:
+        return
+
+    under_thr = perf_rules["underperformer_threshold"]
+    over_thr = perf_rules["strong_performer_threshold"] * 100
+    top_n = perf_rules["top_underperformers_to_show"]
+
+    if n < _VECTORIZE_MIN:
+        # Small portfolios: one fused loop beats the array-construction cost
+        under_indices = []
+        under_count = over_count = 0
+        total_loss = total_gain = 0.0
+        for i in range(n):
+            r = pct_returns[i]
+            if r < under_thr:
+                under_count += 1
+                total_loss += abs_returns[i]
+                under_indices.append(i)
+            elif r > over_thr:
+                over_count += 1
+                total_gain += abs_returns[i]
+    else:
+        # Classify all holdings in one pass: the JIT kernel when available,
+        # otherwise vectorized masks instead of per-holding loops
+        returns_pct = np.asarray(pct_returns, dtype=np.float64)
+        returns_abs = np.asarray(abs_returns, dtype=np.float64)
+
+        if _analyze_returns is not None:
+            under_count, over_count, total_loss, total_gain = _analyze_returns(
+                returns_pct, returns_abs, float(under_thr), float(over_thr)
+            )
+            under_indices = (
+                np.flatnonzero(returns_pct < under_thr) if under_count else ()
+            )
+        else:
+            under_mask = returns_pct < under_thr
+            over_mask = returns_pct > over_thr
+
+            under_count = int(under_mask.sum())
+            over_count = int(over_mask.sum())
+            total_loss = float(returns_abs[under_mask].sum())
+            total_gain = float(returns_abs[over_mask].sum())
+            under_indices = np.flatnonzero(under_mask)
+
+    if under_count:
+        # Keep the preformatted description for the frontend, but also expose
+        # the raw numbers so consumers can format/aggregate without parsing it
         summary.append({
             "type": "performance",
             "title": "Underperforming Funds",
-            "description": f"{len(underperformers)} funds are in loss, totaling ₹{abs(total_loss):,.0f} unrealized loss."
+            "description": f"{under_count} funds are in loss, totaling {_fmt_inr(round(abs(total_loss)))} unrealized loss.",
+            "count": under_count,
+            "total_loss": float(total_loss),
+            "currency": "INR"
         })
-        
-        # Top N underperformers
-        for fund in underperformers[:perf_rules["top_underperformers_to_show"]]:
+
+        # Worst N underperformers by return - partial selection instead of
+        # relying on (or paying for) any input ordering
+        names = cols["scheme_name"]
+        for idx in heapq.nsmallest(top_n, under_indices, key=pct_returns.__getitem__):
             opportunities.append({
                 "type": "review_needed",
-                "fund": fund["scheme_name"][:50],
-                "return": f"{fund['percentage_return']:.1f}%",
+                "fund": names[idx][:50],
+                "return": f"{pct_returns[idx]:.1f}%",
                 "suggestion": "Review fund's recent performance and consider switching if consistently underperforming benchmark."
             })
-    
-    if outperformers:
-        total_gain = sum(h.get("absolute_return", 0) for h in outperformers)
+
+    if over_count:
         summary.append({
             "type": "performance",
             "title": "Strong Performers",
-            "description": f"{len(outperformers)} funds have delivered >15% returns, totaling ₹{total_gain:,.0f} in gains."
+            "description": f"{over_count} funds have delivered >15% returns, totaling {_fmt_inr(round(total_gain))} in gains.",
+            "count": over_count,
+            "total_gain": float(total_gain),
+            "currency": "INR"
         })
-    
-    return {"summary": summary, "opportunities": opportunities}
 
 
-def detect_fund_overlap(holdings: List[Dict]) -> Dict[str, List]:
+def detect_fund_overlap(cols: Dict[str, tuple], out: InsightBuckets) -> None:
     """Detect potential fund overlap issues."""
-    risks = []
-    actionables = []
-    
-    # Get fund overlap rules from config
-    overlap_rules = rules.fund_overlap
-    
-    # Group by asset class
-    equity_funds = [h for h in holdings if h.get("asset_class") == "equity"]
-    
-    # Check for similar fund categories
-    large_cap_funds = []
-    flexi_cap_funds = []
-    
-    for fund in equity_funds:
-        name_lower = fund.get("scheme_name", "").lower()
-        
+    risks = out.risks
+    actionables = out.actionables
+
+    # Check for similar fund categories - single pass over the columns that
+    # filters equity funds and lowercases each scheme name exactly once.
+    # Only the counts matter downstream.
+    large_cap_count = 0
+    flexi_cap_count = 0
+
+    for asset_class, name in zip(cols["asset_class"], cols["scheme_name"]):
+        if asset_class != "equity":
+            continue
+
+        name_lower = name.lower()
+
         # Check large cap
-        if any(keyword in name_lower for keyword in overlap_rules["large_cap"]["keywords"]):
-            large_cap_funds.append(fund)
-        
+        if _LARGE_CAP_RE.search(name_lower):
+            large_cap_count += 1
+
         # Check flexi cap
-        if any(keyword in name_lower for keyword in overlap_rules["flexi_cap"]["keywords"]):
-            flexi_cap_funds.append(fund)
-    
+        if _FLEXI_CAP_RE.search(name_lower):
+            flexi_cap_count += 1
+
     # Large cap overlap check
-    if len(large_cap_funds) > overlap_rules["large_cap"]["threshold"]:
-        lc_rule = overlap_rules["large_cap"]
-        risks.append({
-            "type": "fund_overlap",
-            "severity": lc_rule["severity"],
-            "title": lc_rule["title"],
-            "description": lc_rule["description_template"].format(count=len(large_cap_funds)),
-            "recommendation": lc_rule["recommendation"]
-        })
-        actionables.append({
-            "priority": lc_rule["actionable"]["priority"],
-            "action": lc_rule["actionable"]["action"],
-            "description": lc_rule["actionable"]["description"],
-            "impact": lc_rule["actionable"]["impact"]
-        })
-    
+    if large_cap_count > _OVERLAP_LARGE_CAP["threshold"]:
+        lc_rule = _OVERLAP_LARGE_CAP
+        risks.append(Risk(
+            type="fund_overlap",
+            severity=lc_rule["severity"],
+            title=lc_rule["title"],
+            description=lc_rule["description_fmt"](count=large_cap_count),
+            recommendation=lc_rule["recommendation"]
+        ))
+        actionables.append(Actionable(
+            priority=lc_rule["actionable"]["priority"],
+            action=lc_rule["actionable"]["action"],
+            description=lc_rule["actionable"]["description"],
+            impact=lc_rule["actionable"]["impact"]
+        ))
+
     # Flexi cap overlap check
-    if len(flexi_cap_funds) > overlap_rules["flexi_cap"]["threshold"]:
-        fc_rule = overlap_rules["flexi_cap"]
-        risks.append({
-            "type": "fund_overlap",
-            "severity": fc_rule["severity"],
-            "title": fc_rule["title"],
-            "description": fc_rule["description_template"].format(count=len(flexi_cap_funds)),
-            "recommendation": fc_rule["recommendation"]
-        })
-    
-    return {"risks": risks, "actionables": actionables}
+    if flexi_cap_count > _OVERLAP_FLEXI_CAP["threshold"]:
+        fc_rule = _OVERLAP_FLEXI_CAP
+        risks.append(Risk(
+            type="fund_overlap",
+            severity=fc_rule["severity"],
+            title=fc_rule["title"],
+            description=fc_rule["description_fmt"](count=flexi_cap_count),
+            recommendation=fc_rule["recommendation"]
+        ))
 
 
-def calculate_health_score(insights: Dict, portfolio: Dict) -> Dict[str, Any]:
+def calculate_health_score(out: InsightBuckets, portfolio: Dict) -> Dict[str, Any]:
     """Calculate overall portfolio health score."""
     score = 100
     factors = []
-    
-    # Get health score rules from config
-    hs_rules = rules.health_score
-    penalties = hs_rules["penalties"]
-    
-    # Deduct for risks
-    high_risks = len([r for r in insights.get("risks", []) if r.get("severity") == "high"])
-    medium_risks = len([r for r in insights.get("risks", []) if r.get("severity") == "medium"])
-    low_risks = len([r for r in insights.get("risks", []) if r.get("severity") == "low"])
-    
-    score -= high_risks * penalties["high_risk"]
-    score -= medium_risks * penalties["medium_risk"]
-    score -= low_risks * penalties["low_risk"]
+
+    penalties = _HS_PENALTIES
+
+    # Deduct for risks - count all severities in a single pass
+    severities = Counter(r.severity for r in out.risks)
+
+    score -= severities["high"] * penalties["high_risk"]
+    score -= severities["medium"] * penalties["medium_risk"]
+    score -= severities["low"] * penalties["low_risk"]
     
     # Add for good performance
-    bonuses = hs_rules["bonuses"]
+    bonuses = _HS_BONUSES
     summary = portfolio.get("summary", {})
     return_pct = summary.get("return_percentage", 0) / 100
     
@@ -310,20 +562,12 @@ def calculate_health_score(insights: Dict, portfolio: Dict) -> Dict[str, Any]:
     
     score = max(0, min(100, score))  # Clamp between 0-100
     
-    # Determine grade
-    grades = hs_rules["grades"]
-    if score >= grades["A"]["min_score"]:
-        grade = "A"
-        verdict = grades["A"]["verdict"]
-    elif score >= grades["B"]["min_score"]:
-        grade = "B"
-        verdict = grades["B"]["verdict"]
-    elif score >= grades["C"]["min_score"]:
-        grade = "C"
-        verdict = grades["C"]["verdict"]
-    else:
-        grade = "D"
-        verdict = grades["D"]["verdict"]
+    # Determine grade from the precomputed descending threshold table
+    grade, verdict = _HS_GRADE_TABLE[-1][1], _HS_GRADE_TABLE[-1][2]
+    for min_score, g, v in _HS_GRADE_TABLE:
+        if score >= min_score:
+            grade, verdict = g, v
+            break
     
     return {
         "score": score,
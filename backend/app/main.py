@@ -1,21 +1,31 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import flag_modified
+import asyncio
 import tempfile
 import os
 import json
+import shutil
 import logging
+import pandas as pd
+from collections import defaultdict
 from datetime import datetime
-from copy import deepcopy
+from functools import lru_cache
+from itertools import chain
 import uuid
 
 from app.parser import parse_cas_file
 from app.us_equity_parser import parse_us_equity_pdf, is_us_equity_pdf
 from app.insights import generate_insights
-from app.database import get_db, init_db, User, Portfolio
+from sqlalchemy import cast, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+
+from app.database import get_db, init_db, User, Portfolio, engine
 from app.auth import (
     OTPRequest, OTPVerify, Token, TokenData,
     send_otp, verify_otp, create_access_token,
@@ -36,6 +46,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/api/docs" if settings.DEBUG else None,  # Disable docs in production
     redoc_url="/api/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,  # orjson serializes the large portfolio payloads
 )
 
 # Initialize database on startup
@@ -43,9 +54,9 @@ app = FastAPI(
 def startup():
     init_db()
     logger.info("Database initialized")
-    logger.info(f"CORS origins: {settings.CORS_ORIGINS}")
-    logger.info(f"Demo mode: {settings.DEMO_MODE}")
-    logger.info(f"Production: {settings.is_production}")
+    logger.info("CORS origins: %s", settings.CORS_ORIGINS)
+    logger.info("Demo mode: %s", settings.DEMO_MODE)
+    logger.info("Production: %s", settings.is_production)
 
 # CORS for React frontend - supports multiple origins from config
 app.add_middleware(
@@ -93,13 +104,17 @@ async def api_send_otp(request: OTPRequest, db: Session = Depends(get_db)):
     result = send_otp(request.phone)
     
     if result["success"]:
-        # Create or update user record
-        user = db.query(User).filter(User.phone == request.phone).first()
-        if not user:
-            user = User(phone=request.phone)
-            db.add(user)
-            db.commit()
-    
+        # Create user record if missing - one-statement upsert instead of
+        # SELECT-then-INSERT (also closes the race between concurrent sends)
+        if engine.dialect.name == "postgresql":
+            stmt = pg_insert(User).values(phone=request.phone).on_conflict_do_nothing(
+                index_elements=["phone"]
+            )
+        else:
+            stmt = insert(User).values(phone=request.phone).prefix_with("OR IGNORE")
+        db.execute(stmt)
+        db.commit()
+
     return result
 
 
@@ -109,11 +124,13 @@ async def api_verify_otp(request: OTPVerify, db: Session = Depends(get_db)):
     if not verify_otp(request.phone, request.otp):
         raise HTTPException(status_code=401, detail="Invalid OTP")
     
-    # Update last login
-    user = db.query(User).filter(User.phone == request.phone).first()
-    if user:
-        user.last_login = datetime.utcnow()
-        db.commit()
+    # Update last login - direct UPDATE, no need to load the User row
+    db.execute(
+        update(User)
+        .where(User.phone == request.phone)
+        .values(last_login=datetime.utcnow())
+    )
+    db.commit()
     
     # Generate token
     access_token = create_access_token(request.phone)
@@ -146,6 +163,53 @@ async def get_me(
 
 # ==================== PORTFOLIO AGGREGATION HELPERS ====================
 
+async def get_master_portfolio(
+    request: Request,
+    current_user: TokenData = Depends(require_auth),
+    db: Session = Depends(get_db)
+) -> Optional[Portfolio]:
+    """
+    Dependency that loads the user's master portfolio row once per request
+    and caches it on request.state, so chained handlers/helpers don't each
+    re-query (and re-deserialize) the full JSON blob.
+    """
+    if hasattr(request.state, "master_portfolio"):
+        return request.state.master_portfolio
+
+    master = db.query(Portfolio).options(
+        load_only(Portfolio.id, Portfolio.uploaded_at, Portfolio.portfolio_data)
+    ).filter(
+        Portfolio.phone == current_user.phone,
+        Portfolio.filename == "__master__"
+    ).first()
+    request.state.master_portfolio = master
+    return master
+
+
+async def get_master_portfolio_data(
+    request: Request,
+    current_user: TokenData = Depends(require_auth),
+    db: Session = Depends(get_db)
+) -> Optional[Dict[str, Any]]:
+    """
+    Read-only variant of get_master_portfolio: a Core-level select of just
+    the portfolio_data column hands back the JSON dict directly, skipping
+    ORM instrumentation, identity-map bookkeeping and object hydration for
+    endpoints that never touch the row itself.
+    """
+    if hasattr(request.state, "master_portfolio_data"):
+        return request.state.master_portfolio_data
+
+    data = db.execute(
+        select(Portfolio.portfolio_data).where(
+            Portfolio.phone == current_user.phone,
+            Portfolio.filename == "__master__"
+        )
+    ).scalar_one_or_none()
+    request.state.master_portfolio_data = data
+    return data
+
+
 def get_or_create_master_portfolio(db: Session, phone: str) -> Portfolio:
     """Get or create the master portfolio for a user."""
     portfolio = db.query(Portfolio).filter(
@@ -170,6 +234,7 @@ def get_or_create_master_portfolio(db: Session, phone: str) -> Portfolio:
                     "folio_count": 0
                 },
                 "holdings": [],
+                "holdings_by_source": {},
                 "asset_allocation": [],
                 "amc_allocation": [],
                 "insights": {}
@@ -182,14 +247,85 @@ def get_or_create_master_portfolio(db: Session, phone: str) -> Portfolio:
     return portfolio
 
 
+# Top-level keys a manual-entry mutation can change; everything else in
+# the blob (segments, investor) is untouched by those paths.
+_MANUAL_ENTRY_FIELDS = (
+    "holdings", "holdings_by_source", "summary",
+    "asset_allocation", "amc_allocation", "insights",
+)
+
+
+def _save_portfolio_fields(
+    db: Session,
+    master: Portfolio,
+    data: Dict[str, Any],
+    fields: tuple,
+    touch: bool = False,
+) -> None:
+    """
+    Persist only the named top-level keys of portfolio_data.
+
+    On Postgres this nests jsonb_set calls so unchanged keys are not
+    re-sent; on SQLite the blob is TEXT, so the whole dict is reassigned
+    (the only way to write it there).
+    """
+    if engine.dialect.name == "postgresql":
+        expr = Portfolio.portfolio_data
+        for field_name in fields:
+            expr = func.jsonb_set(
+                expr, "{%s}" % field_name, cast(json.dumps(data[field_name]), JSONB)
+            )
+        values: Dict[str, Any] = {"portfolio_data": expr}
+        if touch:
+            values["uploaded_at"] = datetime.utcnow()
+        db.execute(update(Portfolio).where(Portfolio.id == master.id).values(**values))
+    else:
+        # The handlers mutate the loaded dict in place, which also mutates
+        # the session's committed-state snapshot - equality-based change
+        # detection would see nothing to flush, so flag the attribute dirty
+        # explicitly (there is no MutableDict tracking on this column)
+        master.portfolio_data = data
+        flag_modified(master, "portfolio_data")
+        if touch:
+            master.uploaded_at = datetime.utcnow()
+    db.commit()
+
+
+def _holdings_by_source(portfolio_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the per-source holdings index, building it from the flat list the
+    first time a legacy portfolio (without the index) is touched.
+    """
+    by_source = portfolio_data.get("holdings_by_source")
+    if by_source is None:
+        by_source = {}
+        for h in portfolio_data.get("holdings", []):
+            by_source.setdefault(h.get("source", "unknown"), []).append(h)
+        portfolio_data["holdings_by_source"] = by_source
+    return by_source
+
+
+def _flatten_holdings(portfolio_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rebuild the flat holdings list (what the frontend reads) from the index."""
+    flat = list(chain.from_iterable(portfolio_data["holdings_by_source"].values()))
+    portfolio_data["holdings"] = flat
+    return flat
+
+
 def merge_portfolio_segment(master_data: Dict[str, Any], segment_data: Dict[str, Any], source: str, filename: str) -> Dict[str, Any]:
-    """Merge a new segment into the master portfolio."""
-    result = deepcopy(master_data)
-    
+    """
+    Merge a new segment into the master portfolio.
+
+    Mutates master_data in place and returns it. When master_data came off
+    a session-loaded row, assignment alone won't mark the row dirty (the
+    in-place mutation also touched the session's snapshot) - callers must
+    flag_modified the column before committing, as upload_cas does.
+    """
+    result = master_data
+
     # Initialize segments dict if not exists
-    if "segments" not in result:
-        result["segments"] = {}
-    
+    result.setdefault("segments", {})
+
     # Store segment metadata
     segment_summary = segment_data.get("summary", {})
     result["segments"][source] = {
@@ -200,7 +336,8 @@ def merge_portfolio_segment(master_data: Dict[str, Any], segment_data: Dict[str,
         "source_summary": segment_summary
     }
     
-    logger.info(f"Merging segment '{source}' with {len(segment_data.get('holdings', []))} holdings, value: {segment_summary.get('total_value', 0)}")
+    logger.info("Merging segment '%s' with %d holdings, value: %s",
+                source, len(segment_data.get("holdings", [])), segment_summary.get("total_value", 0))
     
     # Update investor info (prefer CAS data)
     if source == "cas" or not result.get("investor", {}).get("name"):
@@ -208,91 +345,221 @@ def merge_portfolio_segment(master_data: Dict[str, Any], segment_data: Dict[str,
         if investor.get("name"):
             result["investor"] = investor
     
-    # Remove old holdings from this source and add new ones
-    existing_holdings = [h for h in result.get("holdings", []) 
-                        if h.get("source") != source]
-    
-    logger.info(f"Keeping {len(existing_holdings)} holdings from other sources")
-    
-    new_holdings = []
-    for holding in segment_data.get("holdings", []):
-        h = deepcopy(holding)
-        h["source"] = source
-        new_holdings.append(h)
-    
-    logger.info(f"Adding {len(new_holdings)} new holdings from '{source}'")
-    
-    result["holdings"] = existing_holdings + new_holdings
-    
+    # Replace this source's bucket in the per-source index; holdings from
+    # other sources are untouched instead of being re-filtered
+    by_source = _holdings_by_source(result)
+
+    # Holdings are flat dicts of scalars, so a shallow copy is a full copy
+    new_holdings = [{**holding, "source": source} for holding in segment_data.get("holdings", [])]
+
+    logger.info("Adding %d new holdings from '%s'", len(new_holdings), source)
+
+    by_source[source] = new_holdings
+
     # Log some sample holdings values for debugging
-    if new_holdings:
+    if new_holdings and logger.isEnabledFor(logging.DEBUG):
         sample = new_holdings[0]
-        logger.info(f"Sample holding from '{source}': {sample.get('scheme_name', 'N/A')[:30]}, value: {sample.get('current_value', 0)}")
-    
-    # Recalculate summary and allocations
-    result = recalculate_portfolio_totals(result)
-    
+        logger.debug("Sample holding from '%s': %s, value: %s",
+                     source, sample.get("scheme_name", "N/A")[:30], sample.get("current_value", 0))
+
+    # Rebuild the flat list and recalculate summary and allocations. Large
+    # portfolios go through the vectorized/SQL aggregators; small ones fuse
+    # the flatten and aggregation into one pass over the source buckets.
+    n_total = sum(map(len, by_source.values()))
+    if n_total >= _DATAFRAME_MIN:
+        _flatten_holdings(result)
+        result = recalculate_portfolio_totals(result)
+    else:
+        flat: List[Dict[str, Any]] = []
+        asset_classes, amcs, (total_value, total_invested, folio_count) = \
+            _aggregate_holdings_py(chain.from_iterable(by_source.values()), collect=flat)
+        result["holdings"] = flat
+        result = _finalize_totals(
+            result, asset_classes, amcs,
+            total_value, total_invested, folio_count, len(flat),
+        )
+
     return result
 
 
-def recalculate_portfolio_totals(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Recalculate all totals and allocations from holdings."""
-    holdings = portfolio_data.get("holdings", [])
-    
+# Aggregation over the not-yet-persisted holdings list, pushed into
+# Postgres by binding the holdings as a JSONB array; grouping and numeric
+# sums then run in C inside the database instead of Python dict loops.
+# GROUPING SETS computes both allocations and the grand totals from one
+# scan of the array, so the payload crosses the wire exactly once.
+_PG_HOLDINGS_AGG = text("""
+    SELECT CASE WHEN GROUPING(asset_class) = 0 THEN 'asset'
+                WHEN GROUPING(amc) = 0 THEN 'amc'
+                ELSE 'total' END AS bucket,
+           asset_class, amc,
+           SUM(current_value) AS value,
+           SUM(invested_amount) AS invested,
+           COUNT(*) AS count,
+           COUNT(DISTINCT NULLIF(folio, '')) AS folio_count
+    FROM (
+        SELECT COALESCE(h->>'asset_class', 'Other') AS asset_class,
+               COALESCE(h->>'amc', 'Unknown') AS amc,
+               COALESCE((h->>'current_value')::numeric, 0) AS current_value,
+               COALESCE((h->>'invested_amount')::numeric, 0) AS invested_amount,
+               h->>'folio' AS folio
+        FROM jsonb_array_elements(CAST(:holdings AS jsonb)) AS h
+    ) AS t
+    GROUP BY GROUPING SETS ((asset_class), (amc), ())
+""")
+
+# Below this many holdings the in-process aggregators win: the push-down
+# ships the whole array as a bind parameter over a network round trip,
+# which only pays off once the Python/pandas side gets expensive.
+_SQL_AGG_MIN = 256
+
+
+def _aggregate_holdings_sql(holdings: List[Dict[str, Any]]):
+    """Aggregate totals and allocations in Postgres over the bound holdings."""
+    payload = json.dumps(holdings)
+    with engine.connect() as conn:
+        rows = conn.execute(_PG_HOLDINGS_AGG, {"holdings": payload}).all()
+
+    asset_classes: Dict[str, tuple] = {}
+    amcs: Dict[str, tuple] = {}
+    totals = (0.0, 0.0, 0)
+    for r in rows:
+        if r.bucket == "asset":
+            asset_classes[r.asset_class] = (float(r.value), r.count)
+        elif r.bucket == "amc":
+            amcs[r.amc] = (float(r.value), r.count)
+        else:
+            totals = (float(r.value or 0), float(r.invested or 0), r.folio_count or 0)
+    return asset_classes, amcs, totals
+
+
+# Below this many holdings the plain Python loop beats DataFrame
+# construction overhead; above it the vectorized groupby wins.
+_DATAFRAME_MIN = 32
+
+
+def _aggregate_holdings_df(holdings: List[Dict[str, Any]]):
+    """Aggregate totals and allocations with vectorized pandas group-bys."""
+    df = pd.DataFrame(holdings).reindex(
+        columns=["current_value", "invested_amount", "asset_class", "amc", "folio"]
+    )
+    df["current_value"] = pd.to_numeric(df["current_value"], errors="coerce").fillna(0)
+    df["invested_amount"] = pd.to_numeric(df["invested_amount"], errors="coerce").fillna(0)
+    df["asset_class"] = df["asset_class"].fillna("Other")
+    df["amc"] = df["amc"].fillna("Unknown")
+
+    asset_agg = df.groupby("asset_class")["current_value"].agg(["sum", "size"])
+    asset_classes = {
+        k: (float(v), int(c))
+        for k, v, c in zip(asset_agg.index, asset_agg["sum"], asset_agg["size"])
+    }
+    amc_agg = df.groupby("amc")["current_value"].agg(["sum", "size"])
+    amcs = {
+        k: (float(v), int(c))
+        for k, v, c in zip(amc_agg.index, amc_agg["sum"], amc_agg["size"])
+    }
+
+    folios = df["folio"].dropna()
+    return asset_classes, amcs, (
+        float(df["current_value"].sum()),
+        float(df["invested_amount"].sum()),
+        int(folios[folios != ""].nunique()),
+    )
+
+
+def _aggregate_holdings_py(holdings, collect: Optional[List] = None):
+    """
+    Aggregate totals and allocations in a single Python pass.
+
+    When `collect` is given, each holding is also appended to it during the
+    same scan, fusing a flatten pass with the aggregation pass.
+    """
+    append = collect.append if collect is not None else None
     total_value = 0
     total_invested = 0
-    asset_classes = {}
-    amcs = {}
+    # Two-slot [value, count] buckets: defaultdict skips the membership
+    # branch and the per-key 2-entry dict allocation
+    asset_classes = defaultdict(lambda: [0.0, 0])
+    amcs = defaultdict(lambda: [0.0, 0])
     folios = set()
-    
+
     for h in holdings:
+        if append is not None:
+            append(h)
+
         value = h.get("current_value", 0) or 0
         invested = h.get("invested_amount", 0) or 0
-        asset_class = h.get("asset_class", "Other")
-        amc = h.get("amc", "Unknown")
         folio = h.get("folio", "")
-        
+
         total_value += value
         total_invested += invested
-        
+
         # Asset allocation
-        if asset_class not in asset_classes:
-            asset_classes[asset_class] = {"value": 0, "count": 0}
-        asset_classes[asset_class]["value"] += value
-        asset_classes[asset_class]["count"] += 1
-        
+        bucket = asset_classes[h.get("asset_class", "Other")]
+        bucket[0] += value
+        bucket[1] += 1
+
         # AMC allocation
-        if amc not in amcs:
-            amcs[amc] = {"value": 0, "count": 0}
-        amcs[amc]["value"] += value
-        amcs[amc]["count"] += 1
-        
+        bucket = amcs[h.get("amc", "Unknown")]
+        bucket[0] += value
+        bucket[1] += 1
+
         if folio:
             folios.add(folio)
-    
+
+    return asset_classes, amcs, (total_value, total_invested, len(folios))
+
+
+def recalculate_portfolio_totals(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Recalculate all totals and allocations from holdings."""
+    holdings = portfolio_data.get("holdings", [])
+
+    if len(holdings) >= _SQL_AGG_MIN and engine.dialect.name == "postgresql":
+        agg = _aggregate_holdings_sql(holdings)
+    elif len(holdings) >= _DATAFRAME_MIN:
+        agg = _aggregate_holdings_df(holdings)
+    else:
+        agg = _aggregate_holdings_py(holdings)
+
+    asset_classes, amcs, (total_value, total_invested, folio_count) = agg
+    return _finalize_totals(
+        portfolio_data, asset_classes, amcs,
+        total_value, total_invested, folio_count, len(holdings),
+    )
+
+
+def _finalize_totals(
+    portfolio_data: Dict[str, Any],
+    asset_classes: Dict,
+    amcs: Dict,
+    total_value: float,
+    total_invested: float,
+    folio_count: int,
+    scheme_count: int,
+) -> Dict[str, Any]:
+    """Write summary and allocation tables from aggregated buckets."""
     # Build asset allocation with percentages
     asset_allocation = []
-    for asset_class, data in asset_classes.items():
-        pct = (data["value"] / total_value * 100) if total_value > 0 else 0
+    for asset_class, (value, count) in asset_classes.items():
+        pct = (value / total_value * 100) if total_value > 0 else 0
         # Normalize asset class names for display
         display_name = normalize_asset_class(asset_class)
         asset_allocation.append({
             "asset_class": display_name,
-            "value": round(data["value"], 2),
+            "value": round(value, 2),
             "percentage": round(pct, 2),
-            "scheme_count": data["count"]
+            "scheme_count": count
         })
     asset_allocation.sort(key=lambda x: x["value"], reverse=True)
     
     # Build AMC allocation with percentages
     amc_allocation = []
-    for amc, data in amcs.items():
-        pct = (data["value"] / total_value * 100) if total_value > 0 else 0
+    for amc, (value, count) in amcs.items():
+        pct = (value / total_value * 100) if total_value > 0 else 0
         amc_allocation.append({
             "amc": amc,
-            "value": round(data["value"], 2),
+            "value": round(value, 2),
             "percentage": round(pct, 2),
-            "scheme_count": data["count"]
+            "scheme_count": count
         })
     amc_allocation.sort(key=lambda x: x["value"], reverse=True)
     
@@ -304,8 +571,8 @@ def recalculate_portfolio_totals(portfolio_data: Dict[str, Any]) -> Dict[str, An
         "total_invested": round(total_invested, 2),
         "total_return": round(total_return, 2),
         "return_percentage": round(return_pct, 2),
-        "scheme_count": len(holdings),
-        "folio_count": len(folios)
+        "scheme_count": scheme_count,
+        "folio_count": folio_count
     }
     
     portfolio_data["asset_allocation"] = asset_allocation
@@ -314,6 +581,60 @@ def recalculate_portfolio_totals(portfolio_data: Dict[str, Any]) -> Dict[str, An
     return portfolio_data
 
 
+def _apply_delta(portfolio_data: Dict[str, Any], holding: Dict[str, Any], sign: int) -> None:
+    """
+    Incrementally apply one holding's addition (+1) or removal (-1) to the
+    summary and allocation tables, instead of re-sweeping every holding.
+
+    Manual entries never carry a folio, so folio_count is left untouched.
+    """
+    value = (holding.get("current_value", 0) or 0) * sign
+    invested = (holding.get("invested_amount", 0) or 0) * sign
+
+    summary = portfolio_data.setdefault("summary", {})
+    total_value = round(summary.get("total_value", 0) + value, 2)
+    total_invested = round(summary.get("total_invested", 0) + invested, 2)
+    total_return = round(total_value - total_invested, 2)
+    summary["total_value"] = total_value
+    summary["total_invested"] = total_invested
+    summary["total_return"] = total_return
+    summary["return_percentage"] = round(
+        (total_return / total_invested * 100) if total_invested > 0 else 0, 2)
+    summary["scheme_count"] = max(0, summary.get("scheme_count", 0) + sign)
+
+    def adjust(rows: List[Dict[str, Any]], field: str, name: str) -> None:
+        row = next((r for r in rows if r.get(field) == name), None)
+        if row is None:
+            if sign < 0:
+                return
+            row = {field: name, "value": 0, "percentage": 0, "scheme_count": 0}
+            rows.append(row)
+
+        row["value"] = round(row["value"] + value, 2)
+        row["scheme_count"] = max(0, row["scheme_count"] + sign)
+        if row["scheme_count"] == 0:
+            rows.remove(row)
+
+        # Percentages shift for every row when the total moves; the row
+        # count is tiny (one per class/AMC), so this stays O(1)-ish
+        for r in rows:
+            r["percentage"] = round(
+                (r["value"] / total_value * 100) if total_value > 0 else 0, 2)
+        rows.sort(key=lambda x: x["value"], reverse=True)
+
+    adjust(
+        portfolio_data.setdefault("asset_allocation", []),
+        "asset_class",
+        normalize_asset_class(holding.get("asset_class") or "Other"),
+    )
+    adjust(
+        portfolio_data.setdefault("amc_allocation", []),
+        "amc",
+        holding.get("amc") or "Unknown",
+    )
+
+
+@lru_cache(maxsize=64)
 def normalize_asset_class(asset_class: str) -> str:
     """Normalize asset class names for consistent display."""
     mapping = {
@@ -333,7 +654,10 @@ def normalize_asset_class(asset_class: str) -> str:
 
 # ==================== PORTFOLIO ENDPOINTS ====================
 
-@app.post("/api/upload-cas", response_model=PortfolioResponse)
+# No response_model on the large-payload endpoints: the dicts are already
+# response-shaped, and pydantic re-validation would traverse the whole
+# portfolio blob again before orjson serializes it.
+@app.post("/api/upload-cas")
 async def upload_cas(
     file: UploadFile = File(...),
     password: Optional[str] = Form(None),
@@ -357,31 +681,35 @@ async def upload_cas(
         raise HTTPException(status_code=400, detail="Only PDF files are accepted (CAS or Vested statements)")
     
     try:
-        # Save uploaded file temporarily
+        # Save uploaded file temporarily - stream in 1MB chunks instead of
+        # materializing the whole PDF as one bytes object in memory
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            content = await file.read()
-            tmp.write(content)
+            shutil.copyfileobj(file.file, tmp, length=1024 * 1024)
             tmp_path = tmp.name
-        
-        # Detect file type and parse
-        logger.info(f"Parsing file: {file.filename}")
-        
-        if is_us_equity_pdf(tmp_path):
-            logger.info("Detected US Equity PDF (Vested/VF Securities)")
-            segment_data = parse_us_equity_pdf(tmp_path)
-            source = "us_equity"
-        else:
-            logger.info("Detected CAS PDF")
-            segment_data = parse_cas_file(tmp_path, password or "")
-            source = "cas"
-        
+
+        # Detect file type and parse; the temp file is only needed for this
+        # block, so the finally removes it on every path - including when a
+        # parser raises - without an exists() check
+        try:
+            logger.info("Parsing file: %s", file.filename)
+
+            # Parsing is synchronous CPU/IO work; run it on the thread pool so
+            # it doesn't block the event loop for other requests
+            if await asyncio.to_thread(is_us_equity_pdf, tmp_path):
+                logger.info("Detected US Equity PDF (Vested/VF Securities)")
+                segment_data = await asyncio.to_thread(parse_us_equity_pdf, tmp_path)
+                source = "us_equity"
+            else:
+                logger.info("Detected CAS PDF")
+                segment_data = await asyncio.to_thread(parse_cas_file, tmp_path, password or "")
+                source = "cas"
+        finally:
+            os.unlink(tmp_path)
+
         # Log parsed data summary
-        logger.info(f"Parsed {source} segment: {segment_data.get('summary', {})}")
-        logger.info(f"Number of holdings: {len(segment_data.get('holdings', []))}")
-        
-        # Cleanup temp file
-        os.unlink(tmp_path)
-        
+        logger.info("Parsed %s segment: %s", source, segment_data.get("summary", {}))
+        logger.info("Number of holdings: %d", len(segment_data.get("holdings", [])))
+
         # If authenticated, merge into master portfolio
         if current_user:
             master = get_or_create_master_portfolio(db, current_user.phone)
@@ -390,12 +718,12 @@ async def upload_cas(
             # Log existing data before merge
             existing_segments = list(master_data.get('segments', {}).keys())
             existing_holdings = len(master_data.get('holdings', []))
-            logger.info(f"Existing portfolio - Segments: {existing_segments}, Holdings: {existing_holdings}")
+            logger.info("Existing portfolio - Segments: %s, Holdings: %d", existing_segments, existing_holdings)
             
             # Log new segment data
             new_holdings = segment_data.get('holdings', [])
             new_total = segment_data.get('summary', {}).get('total_value', 0)
-            logger.info(f"New {source} segment - Holdings: {len(new_holdings)}, Value: {new_total}")
+            logger.info("New %s segment - Holdings: %d, Value: %s", source, len(new_holdings), new_total)
             
             # Merge new segment
             updated_data = merge_portfolio_segment(
@@ -405,35 +733,34 @@ async def upload_cas(
                 file.filename
             )
             
-            # Generate insights
-            updated_data["insights"] = generate_insights(updated_data)
+            # Generate insights (off the event loop - CPU-bound on big portfolios)
+            updated_data["insights"] = await asyncio.to_thread(generate_insights, updated_data)
             
             # Log merged data
             merged_holdings = len(updated_data.get('holdings', []))
             merged_total = updated_data.get('summary', {}).get('total_value', 0)
-            logger.info(f"After merge - Holdings: {merged_holdings}, Total value: {merged_total}")
+            logger.info("After merge - Holdings: %d, Total value: %s", merged_holdings, merged_total)
             
-            # Save - assign new dict to ensure SQLAlchemy detects the change
-            master.portfolio_data = dict(updated_data)
+            # Save - the merge mutated the loaded dict in place (and with it
+            # the session's snapshot), so mark the attribute dirty explicitly
+            master.portfolio_data = updated_data
+            flag_modified(master, "portfolio_data")
             master.uploaded_at = datetime.utcnow()
             db.commit()
             db.refresh(master)  # Refresh to get the committed data
             
-            logger.info(f"Saved portfolio for user {current_user.phone}")
-            logger.info(f"Final segments: {list(updated_data.get('segments', {}).keys())}")
+            logger.info("Saved portfolio for user %s", current_user.phone)
+            logger.info("Final segments: %s", list(updated_data.get("segments", {}).keys()))
             
-            return PortfolioResponse(success=True, data=updated_data)
+            return {"success": True, "data": updated_data, "error": None}
         else:
             # Not authenticated - just return parsed data
-            segment_data["insights"] = generate_insights(segment_data)
-            return PortfolioResponse(success=True, data=segment_data)
+            segment_data["insights"] = await asyncio.to_thread(generate_insights, segment_data)
+            return {"success": True, "data": segment_data, "error": None}
     
     except Exception as e:
-        logger.error(f"Error parsing file: {str(e)}", exc_info=True)
-        # Cleanup on error
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        return PortfolioResponse(success=False, error=str(e))
+        logger.error("Error parsing file: %s", e, exc_info=True)
+        return {"success": False, "data": None, "error": str(e)}
 
 
 @app.post("/api/manual-entry", response_model=PortfolioResponse)
@@ -464,26 +791,22 @@ async def add_manual_entry(
             "source": "manual"
         }
         
-        # Add to holdings
-        holdings = master_data.get("holdings", [])
-        holdings.append(holding)
-        master_data["holdings"] = holdings
-        
-        # Recalculate totals
-        master_data = recalculate_portfolio_totals(master_data)
+        # Add to the manual bucket and rebuild the flat list
+        _holdings_by_source(master_data).setdefault("manual", []).append(holding)
+        _flatten_holdings(master_data)
+
+        # Apply the single-holding delta instead of re-sweeping all holdings
+        _apply_delta(master_data, holding, +1)
         master_data["insights"] = generate_insights(master_data)
+
+        # Save only the keys this path can change
+        _save_portfolio_fields(db, master, master_data, _MANUAL_ENTRY_FIELDS, touch=True)
         
-        # Save
-        master.portfolio_data = dict(master_data)
-        master.uploaded_at = datetime.utcnow()
-        db.commit()
-        db.refresh(master)
-        
-        logger.info(f"Added manual entry for user {current_user.phone}: {holding['scheme_name']}")
+        logger.info("Added manual entry for user %s: %s", current_user.phone, holding["scheme_name"])
         
         return PortfolioResponse(success=True, data=master_data)
     except Exception as e:
-        logger.error(f"Error adding manual entry: {str(e)}", exc_info=True)
+        logger.error("Error adding manual entry: %s", e, exc_info=True)
         return PortfolioResponse(success=False, error=str(e))
 
 
@@ -498,77 +821,72 @@ async def delete_manual_entry(
         master = get_or_create_master_portfolio(db, current_user.phone)
         master_data = master.portfolio_data or {}
         
-        # Remove manual entry with matching scheme name and source
-        holdings = master_data.get("holdings", [])
-        original_count = len(holdings)
-        master_data["holdings"] = [h for h in holdings 
-                                   if not (h.get("source") == "manual" and 
-                                          h.get("scheme_name") == scheme_name)]
-        
-        deleted_count = original_count - len(master_data["holdings"])
-        
+        # Remove matching entries from the manual bucket only; other
+        # sources' holdings are never scanned
+        by_source = _holdings_by_source(master_data)
+        manual = by_source.get("manual", [])
+        kept = []
+        removed = []
+        for h in manual:
+            if h.get("scheme_name") == scheme_name:
+                removed.append(h)
+            else:
+                kept.append(h)
+        by_source["manual"] = kept
+        _flatten_holdings(master_data)
+
+        deleted_count = len(removed)
+
         if deleted_count == 0:
             raise HTTPException(status_code=404, detail="Manual entry not found")
-        
-        # Recalculate totals
-        master_data = recalculate_portfolio_totals(master_data)
+
+        # Apply per-holding deltas instead of re-sweeping all holdings
+        for h in removed:
+            _apply_delta(master_data, h, -1)
         master_data["insights"] = generate_insights(master_data)
+
+        # Save only the keys this path can change
+        _save_portfolio_fields(db, master, master_data, _MANUAL_ENTRY_FIELDS)
         
-        # Save
-        master.portfolio_data = dict(master_data)
-        db.commit()
-        
-        logger.info(f"Deleted manual entry for user {current_user.phone}: {scheme_name}")
+        logger.info("Deleted manual entry for user %s: %s", current_user.phone, scheme_name)
         
         return {"success": True, "deleted": deleted_count}
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting manual entry: {str(e)}", exc_info=True)
+        logger.error("Error deleting manual entry: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/portfolio", response_model=PortfolioResponse)
+@app.get("/api/portfolio")
 async def get_portfolio(
-    current_user: TokenData = Depends(require_auth),
-    db: Session = Depends(get_db)
+    data: Optional[Dict[str, Any]] = Depends(get_master_portfolio_data)
 ):
     """Get the user's aggregated portfolio."""
-    master = db.query(Portfolio).filter(
-        Portfolio.phone == current_user.phone,
-        Portfolio.filename == "__master__"
-    ).first()
-    
-    if not master or not master.portfolio_data.get("holdings"):
-        return PortfolioResponse(success=True, data=None)
-    
-    return PortfolioResponse(success=True, data=master.portfolio_data)
+    if not data or not data.get("holdings"):
+        return {"success": True, "data": None, "error": None}
+
+    return {"success": True, "data": data, "error": None}
 
 
 @app.get("/api/portfolio/segments")
 async def get_portfolio_segments(
-    current_user: TokenData = Depends(require_auth),
-    db: Session = Depends(get_db)
+    data: Optional[Dict[str, Any]] = Depends(get_master_portfolio_data)
 ):
     """Get list of portfolio segments (uploaded files)."""
-    master = db.query(Portfolio).filter(
-        Portfolio.phone == current_user.phone,
-        Portfolio.filename == "__master__"
-    ).first()
-    
-    if not master:
+    if data is None:
         return {"segments": []}
-    
-    segments = master.portfolio_data.get("segments", {})
+
+    segments = data.get("segments", {})
     result = []
     
-    for source, data in segments.items():
+    for source, meta in segments.items():
         result.append({
             "source": source,
-            "filename": data.get("filename", ""),
-            "uploaded_at": data.get("uploaded_at", ""),
-            "holdings_count": data.get("holdings_count", 0),
-            "total_value": data.get("total_value", 0)
+            "filename": meta.get("filename", ""),
+            "uploaded_at": meta.get("uploaded_at", ""),
+            "holdings_count": meta.get("holdings_count", 0),
+            "total_value": meta.get("total_value", 0)
         })
     
     return {"segments": result}
@@ -577,15 +895,10 @@ async def get_portfolio_segments(
 @app.delete("/api/portfolio/segment/{source}")
 async def delete_portfolio_segment(
     source: str,
-    current_user: TokenData = Depends(require_auth),
+    master: Optional[Portfolio] = Depends(get_master_portfolio),
     db: Session = Depends(get_db)
 ):
     """Delete a specific segment from the portfolio."""
-    master = db.query(Portfolio).filter(
-        Portfolio.phone == current_user.phone,
-        Portfolio.filename == "__master__"
-    ).first()
-    
     if not master:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     
@@ -594,15 +907,19 @@ async def delete_portfolio_segment(
     # Remove segment metadata
     if source in data.get("segments", {}):
         del data["segments"][source]
-    
-    # Remove holdings from this source
-    data["holdings"] = [h for h in data.get("holdings", []) if h.get("source") != source]
+
+    # Drop this source's bucket from the index instead of filtering the flat list
+    _holdings_by_source(data).pop(source, None)
+    _flatten_holdings(data)
     
     # Recalculate totals
     data = recalculate_portfolio_totals(data)
     data["insights"] = generate_insights(data)
-    
+
+    # The in-place mutation above also touched the session's snapshot, so
+    # mark the attribute dirty explicitly (no MutableDict tracking here)
     master.portfolio_data = data
+    flag_modified(master, "portfolio_data")
     db.commit()
     
     return {"success": True, "message": f"Segment '{source}' deleted"}
@@ -614,13 +931,14 @@ async def delete_portfolio(
     db: Session = Depends(get_db)
 ):
     """Delete the entire portfolio."""
-    # Delete all portfolios for this user (including old format ones)
+    # Delete all portfolios for this user (including old format ones);
+    # no session sync - nothing reads these rows after the delete
     db.query(Portfolio).filter(
         Portfolio.phone == current_user.phone
-    ).delete()
+    ).delete(synchronize_session=False)
     db.commit()
     
-    logger.info(f"Deleted all portfolios for user {current_user.phone}")
+    logger.info("Deleted all portfolios for user %s", current_user.phone)
     
     return {"success": True, "message": "Portfolio deleted"}
 
@@ -631,13 +949,14 @@ async def reset_portfolio(
     db: Session = Depends(get_db)
 ):
     """Reset portfolio - delete all data and start fresh."""
-    # Delete all portfolios for this user
+    # Delete all portfolios for this user; the DELETE itself returns the
+    # row count, so skip the session-synchronization query
     deleted = db.query(Portfolio).filter(
         Portfolio.phone == current_user.phone
-    ).delete()
+    ).delete(synchronize_session=False)
     db.commit()
     
-    logger.info(f"Reset portfolio for user {current_user.phone}, deleted {deleted} records")
+    logger.info("Reset portfolio for user %s, deleted %d records", current_user.phone, deleted)
     
     return {"success": True, "message": f"Portfolio reset. Deleted {deleted} records."}
 
@@ -645,15 +964,9 @@ async def reset_portfolio(
 # Legacy endpoint for backwards compatibility
 @app.get("/api/portfolios", response_model=List[PortfolioSummary])
 async def get_user_portfolios(
-    current_user: TokenData = Depends(require_auth),
-    db: Session = Depends(get_db)
+    master: Optional[Portfolio] = Depends(get_master_portfolio)
 ):
     """Get portfolio summary (legacy endpoint)."""
-    master = db.query(Portfolio).filter(
-        Portfolio.phone == current_user.phone,
-        Portfolio.filename == "__master__"
-    ).first()
-    
     if not master or not master.portfolio_data.get("holdings"):
         return []
     
@@ -672,19 +985,13 @@ async def get_user_portfolios(
 @app.get("/api/portfolios/{portfolio_id}", response_model=PortfolioResponse)
 async def get_portfolio_by_id(
     portfolio_id: str,
-    current_user: TokenData = Depends(require_auth),
-    db: Session = Depends(get_db)
+    data: Optional[Dict[str, Any]] = Depends(get_master_portfolio_data)
 ):
     """Get portfolio by ID (legacy endpoint)."""
-    master = db.query(Portfolio).filter(
-        Portfolio.phone == current_user.phone,
-        Portfolio.filename == "__master__"
-    ).first()
-    
-    if not master:
+    if data is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
-    
-    return PortfolioResponse(success=True, data=master.portfolio_data)
+
+    return PortfolioResponse(success=True, data=data)
 
 
 @app.get("/api/health")
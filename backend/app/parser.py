@@ -7,13 +7,113 @@ Handles both NSDL CAS (with demat accounts) and CAMS CAS (with folios) formats.
 import casparser
 from casparser.types import NSDLCASData
 from typing import Dict, Any, List
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from decimal import Decimal
+from functools import lru_cache
+from operator import itemgetter
 import logging
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Optional Aho-Corasick matcher: classifies against every keyword of all
+# four asset classes in one linear scan of the scheme name, instead of one
+# regex pass per class. Falls back to the compiled regexes when absent.
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:  # pragma: no cover - optional speedup
+    _ahocorasick = None
+
+# Optional JIT backend for the aggregation kernel, same convention as
+# insights.py: compiled when numba is installed, None otherwise.
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
 
 logger = logging.getLogger(__name__)
 
 
+# Scheme classification keywords, compiled once into one alternation pattern
+# per asset class. A single C-level regex scan replaces ~60 Python-level
+# substring checks per scheme name.
+_EQUITY_KEYWORDS = [
+    "equity", "flexi cap", "flexicap", "large cap", "largecap", "mid cap", "midcap",
+    "small cap", "smallcap", "multi cap", "multicap", "focused", "elss", "tax saver",
+    "bluechip", "blue chip", "value fund", "contra", "dividend yield", "index fund",
+    "nifty", "sensex", "etf", "exchange traded", "thematic", "sectoral", "pharma",
+    "banking", "infrastructure", "consumption", "technology", "it fund"
+]
+
+_DEBT_KEYWORDS = [
+    "debt", "liquid", "overnight", "ultra short", "money market",
+    "low duration", "short duration", "medium duration", "long duration",
+    "gilt", "corporate bond", "credit risk", "banking & psu", "psu bond",
+    "floater", "fixed maturity", "fmp", "income fund", "bond fund"
+]
+
+_HYBRID_KEYWORDS = [
+    "hybrid", "balanced", "aggressive hybrid", "conservative hybrid", "dynamic",
+    "asset allocation", "multi asset", "arbitrage", "equity savings", "balanced advantage"
+]
+
+_GOLD_KEYWORDS = ["gold", "precious metal", "commodities", "silver"]
+
+
+def _keywords_re(keywords: List[str]) -> "re.Pattern":
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+_EQUITY_RE = _keywords_re(_EQUITY_KEYWORDS)
+_DEBT_RE = _keywords_re(_DEBT_KEYWORDS)
+_HYBRID_RE = _keywords_re(_HYBRID_KEYWORDS)
+_GOLD_RE = _keywords_re(_GOLD_KEYWORDS)
+
+# Class priority matches the regex check order: a name matching keywords from
+# several classes is classified as the highest-priority one.
+_CLASS_PRIORITY = ("equity", "debt", "hybrid", "gold")
+
+
+def _build_classify_automaton():
+    automaton = _ahocorasick.Automaton()
+    keyword_lists = (_EQUITY_KEYWORDS, _DEBT_KEYWORDS, _HYBRID_KEYWORDS, _GOLD_KEYWORDS)
+    for rank, keywords in enumerate(keyword_lists):
+        for keyword in keywords:
+            # First class wins for keywords shared between classes
+            if not automaton.exists(keyword):
+                automaton.add_word(keyword, rank)
+    automaton.make_automaton()
+    return automaton
+
+
+if _ahocorasick is not None:
+    _CLASSIFY_AUTOMATON = _build_classify_automaton()
+
+    def _classify_by_keywords(name_lower: str) -> str:
+        """One automaton pass yields all keyword hits; pick the best class."""
+        best = len(_CLASS_PRIORITY)
+        for _, rank in _CLASSIFY_AUTOMATON.iter(name_lower):
+            if rank == 0:
+                return "equity"
+            if rank < best:
+                best = rank
+        return _CLASS_PRIORITY[best] if best < len(_CLASS_PRIORITY) else ""
+else:
+    def _classify_by_keywords(name_lower: str) -> str:
+        if _EQUITY_RE.search(name_lower):
+            return "equity"
+        if _DEBT_RE.search(name_lower):
+            return "debt"
+        if _HYBRID_RE.search(name_lower):
+            return "hybrid"
+        if _GOLD_RE.search(name_lower):
+            return "gold"
+        return ""
+
+
 def parse_cas_file(file_path: str, password: str) -> Dict[str, Any]:
     """
     Parse NSDL CAS PDF file and extract portfolio data.
@@ -36,38 +136,138 @@ def parse_cas_file(file_path: str, password: str) -> Dict[str, Any]:
         raise Exception(f"Failed to parse CAS file: {str(e)}")
 
 
-def to_float(val) -> float:
+def _safe_get(obj, attr, default=None):
+    """Read a field from dict- or object-shaped casparser records."""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(attr, default)
+    return getattr(obj, attr, default)
+
+
+def to_float(val, _float=float) -> float:
     """Convert Decimal or any numeric to float."""
+    # Exact type check first: most values are already floats, and
+    # `type() is` skips the MRO walk isinstance pays. float() itself
+    # handles Decimal, int and numeric strings on the slow path.
+    if type(val) is _float:
+        return val
     if val is None:
         return 0.0
-    if isinstance(val, Decimal):
-        return float(val)
-    return float(val)
+    return _float(val)
+
+
+# Below this, building a DataFrame and aggregating with groupby beats the
+# Python loop; above it construction overhead dominates. Mirrors the gate
+# used for the recalculation helpers in main.py.
+_DATAFRAME_MIN = 32
+
+
+# Display precision per numeric holding field
+_ROUND_SPECS = (
+    ("units", 3),
+    ("nav", 4),
+    ("current_value", 2),
+    ("invested_amount", 2),
+    ("absolute_return", 2),
+    ("percentage_return", 2),
+)
+
+
+def _round_holdings(holdings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Round holding fields to display precision in bulk.
+
+    The transforms build holdings with raw floats; rounding happens here in
+    one pass per field - through np.round on whole columns for large
+    portfolios - instead of 6 round() calls inline per holding.
+    """
+    if len(holdings) >= _DATAFRAME_MIN:
+        for field, digits in _ROUND_SPECS:
+            column = np.round(
+                np.fromiter((h[field] for h in holdings), dtype=np.float64, count=len(holdings)),
+                digits,
+            )
+            for h, value in zip(holdings, column.tolist()):
+                h[field] = value
+    else:
+        _round = round
+        for h in holdings:
+            for field, digits in _ROUND_SPECS:
+                h[field] = _round(h[field], digits)
+    return holdings
+
+
+def _buckets_to_dicts(buckets: Dict[str, List]) -> Dict[str, Dict[str, Any]]:
+    """Convert [value, count] buckets to the {'value', 'scheme_count'} shape."""
+    return {
+        key: {"value": bucket[0], "scheme_count": bucket[1]}
+        for key, bucket in buckets.items()
+    }
+
+
+def _aggregate_parsed_holdings(holdings: List[Dict[str, Any]]):
+    """
+    Aggregate totals and per-class/per-AMC buckets from parsed holdings.
+
+    Returns (total_value, total_invested, asset_classes, amc_holdings) with
+    {"value", "scheme_count"} entries in both mappings. Large portfolios run
+    through pandas groupby so the sums and counts execute in C kernels
+    instead of per-row dict updates.
+    """
+    if len(holdings) >= _DATAFRAME_MIN:
+        df = pd.DataFrame(holdings)
+        total_value = float(df["current_value"].sum())
+        total_invested = float(df["invested_amount"].sum())
+
+        asset_agg = df.groupby("asset_class", sort=False)["current_value"].agg(["sum", "count"])
+        asset_classes = {
+            asset_class: {"value": float(row["sum"]), "scheme_count": int(row["count"])}
+            for asset_class, row in asset_agg.iterrows()
+        }
+        amc_agg = df.groupby("amc", sort=False)["current_value"].agg(["sum", "count"])
+        amc_holdings = {
+            amc: {"value": float(row["sum"]), "scheme_count": int(row["count"])}
+            for amc, row in amc_agg.iterrows()
+        }
+        return total_value, total_invested, asset_classes, amc_holdings
+
+    total_value = 0.0
+    total_invested = 0.0
+    # Two-slot [value, count] buckets: defaultdict turns the check-then-
+    # insert into one lookup and list indexing is a C-level array deref
+    # (same pattern as the recalc loop in main.py)
+    asset_buckets = defaultdict(lambda: [0.0, 0])
+    amc_buckets = defaultdict(lambda: [0.0, 0])
+
+    for h in holdings:
+        value = h["current_value"]
+        total_value += value
+        total_invested += h["invested_amount"]
+
+        bucket = asset_buckets[h["asset_class"]]
+        bucket[0] += value
+        bucket[1] += 1
+
+        bucket = amc_buckets[h["amc"]]
+        bucket[0] += value
+        bucket[1] += 1
+
+    return total_value, total_invested, _buckets_to_dicts(asset_buckets), _buckets_to_dicts(amc_buckets)
 
 
 def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
     """Transform NSDL CAS data (demat accounts) to our portfolio format."""
     
     holdings = []
-    total_value = 0.0
-    
-    # Asset class aggregations
-    asset_classes = {
-        "equity": {"value": 0, "schemes": []},
-        "debt": {"value": 0, "schemes": []},
-        "hybrid": {"value": 0, "schemes": []},
-        "gold": {"value": 0, "schemes": []},
-        "other": {"value": 0, "schemes": []},
-    }
-    
-    # Broker/AMC-wise aggregation
-    broker_holdings = {}
-    
+
     accounts = cas_data.accounts or []
     logger.info(f"Number of demat accounts: {len(accounts)}")
     
     for account in accounts:
-        broker_name = account.name or "Unknown Broker"
+        # A statement has few distinct brokers but many holdings per broker;
+        # interning lets the aggregation dict compare keys by pointer
+        broker_name = sys.intern(account.name or "Unknown Broker")
         account_type = account.type or ""
         dp_id = account.dp_id or ""
         client_id = account.client_id or ""
@@ -90,9 +290,9 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
                 "amc": broker_name,
                 "scheme_name": name,
                 "isin": isin,
-                "units": round(num_shares, 3),
-                "nav": round(price, 4),
-                "current_value": round(value, 2),
+                "units": num_shares,
+                "nav": price,
+                "current_value": value,
                 "invested_amount": 0,  # Not available in NSDL CAS
                 "absolute_return": 0,
                 "percentage_return": 0,
@@ -103,14 +303,6 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
             
             if value > 0 or num_shares > 0:
                 holdings.append(holding)
-                total_value += value
-                asset_classes["equity"]["value"] += value
-                asset_classes["equity"]["schemes"].append(name)
-                
-                if broker_name not in broker_holdings:
-                    broker_holdings[broker_name] = {"value": 0, "schemes": 0}
-                broker_holdings[broker_name]["value"] += value
-                broker_holdings[broker_name]["schemes"] += 1
         
         # Process Mutual Funds (in demat)
         mutual_funds = account.mutual_funds or []
@@ -124,16 +316,16 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
             value = to_float(mf.value)
             
             # Classify the mutual fund
-            asset_class = classify_scheme(name)
+            asset_class = classify_scheme(str(name))
             
             holding = {
                 "folio": f"{dp_id}-{client_id}",
                 "amc": broker_name,
                 "scheme_name": name,
                 "isin": isin,
-                "units": round(units, 3),
-                "nav": round(nav, 4),
-                "current_value": round(value, 2),
+                "units": units,
+                "nav": nav,
+                "current_value": value,
                 "invested_amount": 0,  # Not available in NSDL CAS
                 "absolute_return": 0,
                 "percentage_return": 0,
@@ -144,15 +336,13 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
             
             if value > 0 or units > 0:
                 holdings.append(holding)
-                total_value += value
-                asset_classes[asset_class]["value"] += value
-                asset_classes[asset_class]["schemes"].append(name)
-                
-                if broker_name not in broker_holdings:
-                    broker_holdings[broker_name] = {"value": 0, "schemes": 0}
-                broker_holdings[broker_name]["value"] += value
-                broker_holdings[broker_name]["schemes"] += 1
-    
+
+    _round_holdings(holdings)
+    total_value, _, asset_classes, broker_holdings = _aggregate_parsed_holdings(holdings)
+
+    # Loop-invariant percentage scale: one division, then multiplies
+    pct_scale = 100.0 / total_value if total_value > 0 else 0.0
+
     # Calculate asset allocation percentages
     asset_allocation = []
     for asset_class, data in asset_classes.items():
@@ -160,25 +350,25 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
             asset_allocation.append({
                 "asset_class": asset_class.title(),
                 "value": round(data["value"], 2),
-                "percentage": round(data["value"] / total_value * 100, 2) if total_value > 0 else 0,
-                "scheme_count": len(data["schemes"])
+                "percentage": round(data["value"] * pct_scale, 2),
+                "scheme_count": data["scheme_count"]
             })
-    
+
     # Sort by value descending
-    asset_allocation.sort(key=lambda x: x["value"], reverse=True)
-    holdings.sort(key=lambda x: x["current_value"], reverse=True)
-    
+    asset_allocation.sort(key=itemgetter("value"), reverse=True)
+    holdings.sort(key=itemgetter("current_value"), reverse=True)
+
     # Broker allocation
     amc_allocation = [
         {
             "amc": broker,
             "value": round(data["value"], 2),
-            "percentage": round(data["value"] / total_value * 100, 2) if total_value > 0 else 0,
-            "scheme_count": data["schemes"]
+            "percentage": round(data["value"] * pct_scale, 2),
+            "scheme_count": data["scheme_count"]
         }
         for broker, data in broker_holdings.items()
     ]
-    amc_allocation.sort(key=lambda x: x["value"], reverse=True)
+    amc_allocation.sort(key=itemgetter("value"), reverse=True)
     
     # Extract investor info
     investor_info = cas_data.investor_info
@@ -217,128 +407,268 @@ def transform_nsdl_cas_data(cas_data: NSDLCASData) -> Dict[str, Any]:
     }
 
 
-def transform_cams_cas_data(cas_data) -> Dict[str, Any]:
-    """Transform CAMS CAS data (folios) to our portfolio format."""
-    
-    # Handle both dict and object access
-    def safe_get(obj, attr, default=None):
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(attr, default)
-        return getattr(obj, attr, default)
-    
-    investor_info = safe_get(cas_data, "investor_info", {})
-    folios = safe_get(cas_data, "folios", []) or []
-    
-    holdings = []
+# Folios below this count are processed serially: spinning up worker
+# processes and pickling the records costs more than the loop itself.
+_PARALLEL_FOLIO_MIN = 8
+
+# Column order of the per-folio SoA layout and of the holding records
+# materialized at the JSON boundary
+_HOLDING_FIELDS = (
+    "folio", "amc", "scheme_name", "isin", "units", "nav",
+    "current_value", "invested_amount", "absolute_return",
+    "percentage_return", "asset_class", "valuation_date",
+)
+
+
+def _process_folio(folio) -> Dict[str, List]:
+    """
+    Extract one folio's holdings as parallel columns (dict of lists).
+
+    Top-level (not nested in the transform) so it pickles cleanly for
+    ProcessPoolExecutor workers; folios are independent until aggregation.
+    The columnar layout skips one dict allocation per holding - records
+    are only materialized once, at the response boundary.
+    """
+    # casparser emits one consistent record shape per parse - all dicts or
+    # all model objects - so pick the field accessor once instead of paying
+    # _safe_get's isinstance check on every field read in the loop
+    get = dict.get if isinstance(folio, dict) else getattr
+
+    cols = {field: [] for field in _HOLDING_FIELDS}
+    folio_str = str(get(folio, "folio", ""))
+    # Few distinct AMCs, many holdings each: interning makes the repeated
+    # aggregation-dict lookups an identity compare on the fast path
+    amc_str = sys.intern(str(get(folio, "amc", "Unknown AMC")))
+    schemes = get(folio, "schemes", []) or []
+
+    for scheme in schemes:
+        scheme_name = get(scheme, "scheme", "")
+        isin = get(scheme, "isin", "")
+
+        valuation = get(scheme, "valuation", None)
+        current_value = to_float(get(valuation, "value", 0)) if valuation else 0
+        nav = to_float(get(valuation, "nav", 0)) if valuation else 0
+        valuation_date = get(valuation, "date", "") if valuation else ""
+
+        units = to_float(get(scheme, "close", 0)) or to_float(get(scheme, "close_calculated", 0)) or 0
+
+        if current_value == 0 and units > 0 and nav > 0:
+            current_value = units * nav
+
+        if current_value <= 0 and units <= 0:
+            continue
+
+        transactions = get(scheme, "transactions", []) or []
+        invested_amount = calculate_invested_amount(transactions)
+
+        scheme_type = get(scheme, "type", "")
+        asset_class = classify_scheme(str(scheme_name), str(scheme_type))
+
+        absolute_return = current_value - invested_amount if invested_amount > 0 else 0
+        percentage_return = (absolute_return / invested_amount * 100) if invested_amount > 0 else 0
+
+        cols["folio"].append(folio_str)
+        cols["amc"].append(amc_str)
+        cols["scheme_name"].append(str(scheme_name))
+        cols["isin"].append(str(isin) if isin else "")
+        cols["units"].append(float(units))
+        cols["nav"].append(float(nav))
+        cols["current_value"].append(float(current_value))
+        cols["invested_amount"].append(float(invested_amount))
+        cols["absolute_return"].append(float(absolute_return))
+        cols["percentage_return"].append(float(percentage_return))
+        cols["asset_class"].append(asset_class)
+        cols["valuation_date"].append(str(valuation_date) if valuation_date else "")
+
+    return cols
+
+
+def _round_columns(columns: Dict[str, List]) -> None:
+    """Column-wise counterpart of _round_holdings."""
+    if len(columns["current_value"]) >= _DATAFRAME_MIN:
+        for field, digits in _ROUND_SPECS:
+            columns[field] = np.round(
+                np.asarray(columns[field], dtype=np.float64), digits
+            ).tolist()
+    else:
+        for field, digits in _ROUND_SPECS:
+            columns[field] = [round(value, digits) for value in columns[field]]
+
+
+def _sum_by_id(values, ids, n_groups):
+    """Total plus per-group sums/counts in one fused pass (numba target)."""
+    sums = np.zeros(n_groups, dtype=np.float64)
+    counts = np.zeros(n_groups, dtype=np.int64)
+    total = 0.0
+    for i in range(values.shape[0]):
+        value = values[i]
+        total += value
+        group = ids[i]
+        sums[group] += value
+        counts[group] += 1
+    return total, sums, counts
+
+
+# Eager signature so the compile happens at import, cache=True so the
+# artifact persists across processes (matching _analyze_returns in
+# insights.py). Without numba the pandas groupby path is used instead.
+if _njit is not None:
+    _sum_by_id = _njit(
+        "Tuple((float64, float64[:], int64[:]))(float64[:], int64[:], int64)",
+        cache=True,
+        fastmath=True,
+    )(_sum_by_id)
+else:
+    _sum_by_id = None
+
+
+def _encode_ids(labels: List[str]):
+    """Map labels to dense int ids; returns (id array, label list)."""
+    mapping = {}
+    ids = np.empty(len(labels), dtype=np.int64)
+    for i, label in enumerate(labels):
+        ids[i] = mapping.setdefault(label, len(mapping))
+    return ids, list(mapping)
+
+
+def _aggregate_columns(columns: Dict[str, List]):
+    """
+    Column-wise counterpart of _aggregate_parsed_holdings; same return
+    shape, but the DataFrame path wraps the existing columns directly
+    instead of pivoting a list of records first.
+    """
+    values = columns["current_value"]
+    if len(values) >= _DATAFRAME_MIN and _sum_by_id is not None:
+        value_arr = np.asarray(values, dtype=np.float64)
+        ac_ids, ac_labels = _encode_ids(columns["asset_class"])
+        amc_ids, amc_labels = _encode_ids(columns["amc"])
+
+        total_value, ac_sums, ac_counts = _sum_by_id(value_arr, ac_ids, len(ac_labels))
+        _, amc_sums, amc_counts = _sum_by_id(value_arr, amc_ids, len(amc_labels))
+        total_invested = float(np.sum(np.asarray(columns["invested_amount"], dtype=np.float64)))
+
+        asset_classes = {
+            label: {"value": float(total), "scheme_count": int(count)}
+            for label, total, count in zip(ac_labels, ac_sums, ac_counts)
+        }
+        amc_holdings = {
+            label: {"value": float(total), "scheme_count": int(count)}
+            for label, total, count in zip(amc_labels, amc_sums, amc_counts)
+        }
+        return float(total_value), total_invested, asset_classes, amc_holdings
+
+    if len(values) >= _DATAFRAME_MIN:
+        df = pd.DataFrame({
+            "current_value": values,
+            "asset_class": columns["asset_class"],
+            "amc": columns["amc"],
+        })
+        total_value = float(df["current_value"].sum())
+        total_invested = float(np.sum(np.asarray(columns["invested_amount"])))
+
+        asset_agg = df.groupby("asset_class", sort=False)["current_value"].agg(["sum", "count"])
+        asset_classes = {
+            asset_class: {"value": float(row["sum"]), "scheme_count": int(row["count"])}
+            for asset_class, row in asset_agg.iterrows()
+        }
+        amc_agg = df.groupby("amc", sort=False)["current_value"].agg(["sum", "count"])
+        amc_holdings = {
+            amc: {"value": float(row["sum"]), "scheme_count": int(row["count"])}
+            for amc, row in amc_agg.iterrows()
+        }
+        return total_value, total_invested, asset_classes, amc_holdings
+
     total_value = 0.0
     total_invested = 0.0
-    
-    asset_classes = {
-        "equity": {"value": 0, "schemes": []},
-        "debt": {"value": 0, "schemes": []},
-        "hybrid": {"value": 0, "schemes": []},
-        "gold": {"value": 0, "schemes": []},
-        "other": {"value": 0, "schemes": []},
-    }
-    
-    amc_holdings = {}
-    
-    for folio in folios:
-        folio_number = safe_get(folio, "folio", "")
-        amc = safe_get(folio, "amc", "Unknown AMC")
-        schemes = safe_get(folio, "schemes", []) or []
-        
-        for scheme in schemes:
-            scheme_name = safe_get(scheme, "scheme", "")
-            isin = safe_get(scheme, "isin", "")
-            
-            valuation = safe_get(scheme, "valuation", None)
-            current_value = to_float(safe_get(valuation, "value", 0)) if valuation else 0
-            nav = to_float(safe_get(valuation, "nav", 0)) if valuation else 0
-            valuation_date = safe_get(valuation, "date", "") if valuation else ""
-            
-            units = to_float(safe_get(scheme, "close", 0)) or to_float(safe_get(scheme, "close_calculated", 0)) or 0
-            
-            if current_value == 0 and units > 0 and nav > 0:
-                current_value = units * nav
-            
-            transactions = safe_get(scheme, "transactions", []) or []
-            invested_amount = calculate_invested_amount(transactions)
-            
-            scheme_type = safe_get(scheme, "type", "")
-            asset_class = classify_scheme(scheme_name, scheme_type)
-            
-            absolute_return = current_value - invested_amount if invested_amount > 0 else 0
-            percentage_return = (absolute_return / invested_amount * 100) if invested_amount > 0 else 0
-            
-            holding = {
-                "folio": str(folio_number),
-                "amc": str(amc),
-                "scheme_name": str(scheme_name),
-                "isin": str(isin) if isin else "",
-                "units": round(float(units), 3),
-                "nav": round(float(nav), 4),
-                "current_value": round(float(current_value), 2),
-                "invested_amount": round(float(invested_amount), 2),
-                "absolute_return": round(float(absolute_return), 2),
-                "percentage_return": round(float(percentage_return), 2),
-                "asset_class": asset_class,
-                "valuation_date": str(valuation_date) if valuation_date else "",
-            }
-            
-            if current_value > 0 or units > 0:
-                holdings.append(holding)
-                total_value += current_value
-                total_invested += invested_amount
-                
-                asset_classes[asset_class]["value"] += current_value
-                asset_classes[asset_class]["schemes"].append(scheme_name)
-                
-                amc_str = str(amc)
-                if amc_str not in amc_holdings:
-                    amc_holdings[amc_str] = {"value": 0, "schemes": 0}
-                amc_holdings[amc_str]["value"] += current_value
-                amc_holdings[amc_str]["schemes"] += 1
-    
+    asset_buckets = defaultdict(lambda: [0.0, 0])
+    amc_buckets = defaultdict(lambda: [0.0, 0])
+
+    rows = zip(values, columns["invested_amount"], columns["asset_class"], columns["amc"])
+    for value, invested, asset_class, amc in rows:
+        total_value += value
+        total_invested += invested
+
+        bucket = asset_buckets[asset_class]
+        bucket[0] += value
+        bucket[1] += 1
+
+        bucket = amc_buckets[amc]
+        bucket[0] += value
+        bucket[1] += 1
+
+    return total_value, total_invested, _buckets_to_dicts(asset_buckets), _buckets_to_dicts(amc_buckets)
+
+
+def _columns_to_records(columns: Dict[str, List]) -> List[Dict[str, Any]]:
+    """Materialize holding record dicts from the columns (JSON boundary)."""
+    return [
+        dict(zip(_HOLDING_FIELDS, row))
+        for row in zip(*(columns[field] for field in _HOLDING_FIELDS))
+    ]
+
+
+def transform_cams_cas_data(cas_data) -> Dict[str, Any]:
+    """Transform CAMS CAS data (folios) to our portfolio format."""
+
+    investor_info = _safe_get(cas_data, "investor_info", {})
+    folios = _safe_get(cas_data, "folios", []) or []
+
+    # Folios are independent map-reduce units: fan large statements out to
+    # worker processes (classify_scheme and the transaction sums are pure
+    # Python compute, so this sidesteps the GIL) and fall back to the
+    # serial loop if the pool fails, e.g. on unpicklable records.
+    if len(folios) >= _PARALLEL_FOLIO_MIN:
+        try:
+            with ProcessPoolExecutor() as executor:
+                per_folio = list(executor.map(_process_folio, folios, chunksize=8))
+        except Exception:
+            logger.warning("Parallel folio processing failed; falling back to serial", exc_info=True)
+            per_folio = list(map(_process_folio, folios))
+    else:
+        per_folio = list(map(_process_folio, folios))
+
+    columns = {field: [] for field in _HOLDING_FIELDS}
+    for part in per_folio:
+        for field in _HOLDING_FIELDS:
+            columns[field].extend(part[field])
+
+    _round_columns(columns)
+    total_value, total_invested, asset_classes, amc_holdings = _aggregate_columns(columns)
+    holdings = _columns_to_records(columns)
+
+    # Loop-invariant percentage scale: one division, then multiplies
+    pct_scale = 100.0 / total_value if total_value > 0 else 0.0
+
     asset_allocation = []
     for asset_class, data in asset_classes.items():
         if data["value"] > 0:
             asset_allocation.append({
                 "asset_class": asset_class.title(),
                 "value": round(data["value"], 2),
-                "percentage": round(data["value"] / total_value * 100, 2) if total_value > 0 else 0,
-                "scheme_count": len(data["schemes"])
+                "percentage": round(data["value"] * pct_scale, 2),
+                "scheme_count": data["scheme_count"]
             })
-    
-    asset_allocation.sort(key=lambda x: x["value"], reverse=True)
-    holdings.sort(key=lambda x: x["current_value"], reverse=True)
-    
+
+    asset_allocation.sort(key=itemgetter("value"), reverse=True)
+    holdings.sort(key=itemgetter("current_value"), reverse=True)
+
     amc_allocation = [
         {
             "amc": amc,
             "value": round(data["value"], 2),
-            "percentage": round(data["value"] / total_value * 100, 2) if total_value > 0 else 0,
-            "scheme_count": data["schemes"]
+            "percentage": round(data["value"] * pct_scale, 2),
+            "scheme_count": data["scheme_count"]
         }
         for amc, data in amc_holdings.items()
     ]
-    amc_allocation.sort(key=lambda x: x["value"], reverse=True)
+    amc_allocation.sort(key=itemgetter("value"), reverse=True)
     
     total_return = total_value - total_invested
     return_percentage = (total_return / total_invested * 100) if total_invested > 0 else 0
     
-    def safe_get_nested(obj, attr, default=None):
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(attr, default)
-        return getattr(obj, attr, default)
-    
-    investor_name = safe_get_nested(investor_info, "name", "")
-    investor_email = safe_get_nested(investor_info, "email", "")
-    investor_mobile = safe_get_nested(investor_info, "mobile", "")
+    investor_name = _safe_get(investor_info, "name", "")
+    investor_email = _safe_get(investor_info, "email", "")
+    investor_mobile = _safe_get(investor_info, "mobile", "")
     
     return {
         "investor": {
@@ -361,33 +691,45 @@ def transform_cams_cas_data(cas_data) -> Dict[str, Any]:
     }
 
 
+# Transaction types that add to / remove from the invested amount.
+# frozenset membership is a hashed O(1) check and the constants aren't
+# rebuilt per call the way the old list literals were.
+PURCHASE_TYPES = frozenset({
+    "PURCHASE", "PURCHASE_SIP", "SWITCH_IN", "SWITCH_IN_MERGER",
+    "REINVESTMENT", "REINVEST", "DIVIDEND_REINVEST",
+})
+REDEMPTION_TYPES = frozenset({
+    "REDEMPTION", "SWITCH_OUT", "SWITCH_OUT_MERGER",
+})
+
+
 def calculate_invested_amount(transactions: List) -> float:
     """Calculate total invested amount from transactions using FIFO."""
-    def safe_get(obj, attr, default=None):
-        if obj is None:
-            return default
-        if isinstance(obj, dict):
-            return obj.get(attr, default)
-        return getattr(obj, attr, default)
-    
+    _abs, _float = abs, float
     invested = 0.0
     for txn in transactions:
-        txn_type = str(safe_get(txn, "type", "")).upper()
-        amount = safe_get(txn, "amount", 0) or 0
-        
-        if txn_type in ["PURCHASE", "PURCHASE_SIP", "SWITCH_IN", "SWITCH_IN_MERGER", 
-                        "REINVESTMENT", "REINVEST", "DIVIDEND_REINVEST"]:
-            invested += abs(float(amount))
-        elif txn_type in ["REDEMPTION", "SWITCH_OUT", "SWITCH_OUT_MERGER"]:
-            invested -= abs(float(amount))
-    
+        txn_type = str(_safe_get(txn, "type", "")).upper()
+        amount = _safe_get(txn, "amount", 0) or 0
+
+        if txn_type in PURCHASE_TYPES:
+            invested += _abs(_float(amount))
+        elif txn_type in REDEMPTION_TYPES:
+            invested -= _abs(_float(amount))
+
     return max(invested, 0)
 
 
+@lru_cache(maxsize=4096)
 def classify_scheme(scheme_name: str, scheme_type: str = "") -> str:
-    """Classify mutual fund scheme by asset class based on name and type."""
-    name_lower = str(scheme_name).lower()
-    type_lower = str(scheme_type).lower() if scheme_type else ""
+    """
+    Classify mutual fund scheme by asset class based on name and type.
+
+    Pure over its arguments, and the same scheme names recur across folios
+    and successive uploads, so results are memoized. Callers pass plain
+    strings to keep cache keys stable.
+    """
+    name_lower = scheme_name.lower()
+    type_lower = scheme_type.lower() if scheme_type else ""
     
     if type_lower:
         if "equity" in type_lower:
@@ -397,44 +739,10 @@ def classify_scheme(scheme_name: str, scheme_type: str = "") -> str:
         if "hybrid" in type_lower:
             return "hybrid"
     
-    equity_keywords = [
-        "equity", "flexi cap", "flexicap", "large cap", "largecap", "mid cap", "midcap",
-        "small cap", "smallcap", "multi cap", "multicap", "focused", "elss", "tax saver",
-        "bluechip", "blue chip", "value fund", "contra", "dividend yield", "index fund",
-        "nifty", "sensex", "etf", "exchange traded", "thematic", "sectoral", "pharma",
-        "banking", "infrastructure", "consumption", "technology", "it fund"
-    ]
-    
-    debt_keywords = [
-        "debt", "liquid", "overnight", "ultra short", "money market",
-        "low duration", "short duration", "medium duration", "long duration",
-        "gilt", "corporate bond", "credit risk", "banking & psu", "psu bond",
-        "floater", "fixed maturity", "fmp", "income fund", "bond fund"
-    ]
-    
-    hybrid_keywords = [
-        "hybrid", "balanced", "aggressive hybrid", "conservative hybrid", "dynamic",
-        "asset allocation", "multi asset", "arbitrage", "equity savings", "balanced advantage"
-    ]
-    
-    gold_keywords = ["gold", "precious metal", "commodities", "silver"]
-    
-    for keyword in equity_keywords:
-        if keyword in name_lower:
-            return "equity"
-    
-    for keyword in debt_keywords:
-        if keyword in name_lower:
-            return "debt"
-    
-    for keyword in hybrid_keywords:
-        if keyword in name_lower:
-            return "hybrid"
-    
-    for keyword in gold_keywords:
-        if keyword in name_lower:
-            return "gold"
-    
+    asset_class = _classify_by_keywords(name_lower)
+    if asset_class:
+        return asset_class
+
     if "growth" in name_lower and "fund" in name_lower:
         return "equity"
     
@@ -5,66 +5,111 @@ Loads and validates portfolio evaluation rules from YAML configuration.
 """
 import yaml
 import os
-from typing import Dict, Any
+import pickle
+import string
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, Any
+
+# libyaml-backed loader parses several times faster than the pure-Python
+# SafeLoader; fall back when PyYAML was built without the C extension.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _YamlLoader
+
+
+def _compile_template(template: str):
+    """
+    Pre-parse a format template into a render callable.
+
+    str.format re-parses the template on every call; parsing once with
+    string.Formatter and closing over the segments leaves only the field
+    substitution to do at render time.
+    """
+    segments = tuple(string.Formatter().parse(template))
+
+    def render(**kwargs) -> str:
+        parts = []
+        for literal, field, spec, conversion in segments:
+            if literal:
+                parts.append(literal)
+            if field is not None:
+                value = kwargs[field]
+                if conversion == "s":
+                    value = str(value)
+                elif conversion == "r":
+                    value = repr(value)
+                parts.append(format(value, spec))
+        return "".join(parts)
+
+    return render
+
+
+def _attach_compiled_templates(node) -> None:
+    """Recursively add a compiled '*_fmt' callable next to each '*_template'."""
+    if isinstance(node, dict):
+        for key, value in list(node.items()):
+            if isinstance(value, str) and key.endswith("_template"):
+                node[key[:-len("template")] + "fmt"] = _compile_template(value)
+            else:
+                _attach_compiled_templates(value)
+    elif isinstance(node, list):
+        for item in node:
+            _attach_compiled_templates(item)
 
 
-class RulesConfig:
-    """Singleton configuration loader for portfolio rules."""
-    
-    _instance = None
-    _config = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._load_config()
-        return cls._instance
-    
-    def _load_config(self):
-        """Load rules from YAML file."""
-        config_path = Path(__file__).parent.parent / "config" / "portfolio_rules.yaml"
-        
-        if not config_path.exists():
-            raise FileNotFoundError(f"Rules config not found at {config_path}")
-        
+def _load_config() -> Dict[str, Any]:
+    """Load rules from the YAML file (or its pickle cache)."""
+    config_path = Path(__file__).parent.parent / "config" / "portfolio_rules.yaml"
+
+    if not config_path.exists():
+        raise FileNotFoundError(f"Rules config not found at {config_path}")
+
+    # A pickle of the parsed YAML sits next to the config; loading it is
+    # a straight deserialize instead of a YAML parse. The mtime check
+    # invalidates it whenever the YAML is edited, and any load error
+    # (corruption, protocol mismatch) falls back to parsing.
+    cache_path = config_path.with_suffix(".pkl")
+    config = None
+    try:
+        if cache_path.stat().st_mtime >= config_path.stat().st_mtime:
+            with open(cache_path, "rb") as f:
+                config = pickle.load(f)
+    except Exception:
+        config = None
+
+    if config is None:
         with open(config_path, 'r') as f:
-            self._config = yaml.safe_load(f)
-    
-    @property
-    def concentration(self) -> Dict[str, Any]:
-        """Get concentration risk rules."""
-        return self._config.get("concentration", {})
-    
-    @property
-    def diversification(self) -> Dict[str, Any]:
-        """Get diversification rules."""
-        return self._config.get("diversification", {})
-    
-    @property
-    def asset_allocation(self) -> Dict[str, Any]:
-        """Get asset allocation rules."""
-        return self._config.get("asset_allocation", {})
-    
-    @property
-    def fund_overlap(self) -> Dict[str, Any]:
-        """Get fund overlap detection rules."""
-        return self._config.get("fund_overlap", {})
-    
-    @property
-    def performance(self) -> Dict[str, Any]:
-        """Get performance analysis rules."""
-        return self._config.get("performance", {})
-    
-    @property
-    def health_score(self) -> Dict[str, Any]:
-        """Get health score calculation rules."""
-        return self._config.get("health_score", {})
-    
-    def get_all(self) -> Dict[str, Any]:
-        """Get all rules."""
-        return self._config
-
-
-# Global instance
-rules = RulesConfig()
+            config = yaml.load(f, Loader=_YamlLoader)
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # read-only config dir; the parsed YAML is still good
+
+    # Compile description templates once at load time (the render
+    # callables are closures, so they are attached after pickling)
+    _attach_compiled_templates(config)
+    return config
+
+
+# Loaded once at import. Module import is already serialized by the import
+# lock, so there is no singleton (or its race) to manage, and consumers read
+# sections as plain attribute loads instead of property calls. The
+# MappingProxyType views keep the top-level sections read-only.
+_CONFIG = _load_config()
+
+rules = SimpleNamespace(
+    concentration=MappingProxyType(_CONFIG.get("concentration", {})),
+    diversification=MappingProxyType(_CONFIG.get("diversification", {})),
+    asset_allocation=MappingProxyType(_CONFIG.get("asset_allocation", {})),
+    fund_overlap=MappingProxyType(_CONFIG.get("fund_overlap", {})),
+    performance=MappingProxyType(_CONFIG.get("performance", {})),
+    health_score=MappingProxyType(_CONFIG.get("health_score", {})),
+)
+
+
+def get_all() -> Dict[str, Any]:
+    """Get all rules."""
+    return _CONFIG
@@ -5,15 +5,182 @@ Parses account statements from Vested/VF Securities to extract US stock holdings
 Converts USD values to INR for consistent display.
 """
 import fitz  # PyMuPDF
+import numpy as np
+import os
 import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# PCRE2's JIT compiles the hot symbol/number patterns to machine code and
+# runs them several times faster than Python's re. Optional — deliberately
+# not in requirements.txt; everything falls back to re without it.
+try:
+    import pcre2 as _pcre2
+except ImportError:
+    _pcre2 = None
+
 # USD to INR exchange rate (update this periodically or fetch from API)
 USD_TO_INR = 84.50
 
+# Conversion and paise rounding fused into one scale factor
+_INR_SCALE = USD_TO_INR * 100.0
+
+
+def _to_inr(amount: float) -> float:
+    """Convert a USD amount to INR rounded to 2 decimals via integer math."""
+    cents = amount * _INR_SCALE
+    return int(cents + 0.5 if cents >= 0 else cents - 0.5) / 100
+
+# Compiled once at import; the number pattern runs per candidate line,
+# where re-parsing the pattern source would dominate
+_NUMBER_RE = re.compile(r'[\d,]+\.?\d*|\([\d,]+\.?\d*\)')
+_ACCOUNT_NAME_RE = re.compile(r'Account Name[:\s]*([A-Za-z\s]+?)(?:\n|Account)')
+
+# All-caps words that look like tickers but are description suffixes
+_SYMBOL_STOPWORDS = frozenset({'COM', 'INC', 'ETF', 'TR', 'CLASS', 'CL', 'A', 'B', 'C', 'NEW', 'DEL'})
+
+# Strips currency symbols, thousands separators and whitespace in one
+# C-level pass instead of chained str.replace calls
+_NUMBER_STRIP = str.maketrans('', '', '$, \t')
+
+# Route only the hottest pattern (per candidate line) through PCRE2; the
+# account-name search runs once per document and stays on re. The pattern
+# uses basic syntax shared by the two engines.
+if _pcre2 is not None:
+    try:
+        _NUMBER_JIT = _pcre2.compile(_NUMBER_RE.pattern, jit=True)
+
+        def _findall_numbers(text: str) -> List[str]:
+            return _NUMBER_JIT.findall(text)
+    except Exception:  # pragma: no cover - unexpected pcre2 API/build issue
+        _pcre2 = None
+
+if _pcre2 is None:
+    def _findall_numbers(text: str) -> List[str]:
+        return _NUMBER_RE.findall(text)
+
+# Pages are parsed independently, so multi-page statements are farmed out
+# to a process pool; below this page count the pool overhead isn't worth it
+_PARALLEL_PAGE_MIN = 3
+
+# Word count above which line grouping switches to the vectorized lexsort
+# path; tiny pages stay on the plain dict grouping
+_VECTOR_WORD_MIN = 32
+
+
+def _parse_page_words(words: List[tuple]) -> tuple:
+    """
+    Parse one page's word list into (holdings, text_lines).
+
+    Words come from page.get_text("words") as (x0, y0, x1, y1, word,
+    block_no, line_no, word_no) tuples. text_lines is the page's text
+    reconstructed line by line, used for the account-name search and the
+    regex fallback.
+    """
+    holdings = []
+    text_lines = []
+
+    if not words:
+        return holdings, text_lines
+
+    # Group words into lines by bucketed y-position (5-pixel buckets),
+    # ordered top-to-bottom and left-to-right within a line. For full pages
+    # a single lexsort on (y_bucket, x) replaces the dict grouping and the
+    # per-line Python sorts.
+    if len(words) >= _VECTOR_WORD_MIN:
+        n = len(words)
+        xs = np.fromiter((w[0] for w in words), dtype=np.float64, count=n)
+        y_bucket = (np.fromiter((w[1] for w in words), dtype=np.float64, count=n) // 5).astype(np.int64)
+        order = np.lexsort((xs, y_bucket))
+        breaks = np.where(np.diff(y_bucket[order]) != 0)[0] + 1
+        lines = [
+            [(words[i][0], words[i][4]) for i in chunk]  # (x position, text)
+            for chunk in np.split(order, breaks)
+        ]
+    else:
+        lines_by_y = defaultdict(list)
+        for word in words:
+            lines_by_y[word[1] // 5].append((word[0], word[4]))  # (x position, text)
+
+        # Sort each line by x position
+        for y in lines_by_y:
+            lines_by_y[y].sort(key=lambda x: x[0])
+
+        lines = [lines_by_y[y] for y in sorted(lines_by_y.keys())]
+
+    # Process lines looking for stock data
+    in_holdings_section = False
+
+    for line in lines:
+        line_words = [w[1] for w in line]
+        line_text = " ".join(line_words)
+        text_lines.append(line_text)
+        line_lower = line_text.lower()
+
+        # Check if we're entering holdings section. The Equity match stays
+        # case-sensitive on purpose: all-caps row descriptions legitimately
+        # contain EQUITY (e.g. "EQUITY RESIDENTIAL") and must not be taken
+        # for section headers.
+        if "holdings" in line_lower or "Equity" in line_text:
+            in_holdings_section = True
+            continue
+
+        if "activity" in line_lower:
+            in_holdings_section = False
+            continue
+
+        if not in_holdings_section:
+            continue
+
+        # Try to parse as a stock row
+        # Look for patterns like: STOCK NAME ... SYMBOL NUMBER NUMBER NUMBER ...
+        holding = try_parse_stock_line(line_words, line)
+
+        if holding:
+            holdings.append(holding)
+            logger.info(f"Found: {holding['symbol']} - ${holding.get('usd_value', 0)}")
+
+    return holdings, text_lines
+
+
+def _convert_holdings_to_inr(holdings: List[Dict]) -> None:
+    """
+    Fill each holding's INR fields from its raw USD values in one
+    vectorized pass, then round the USD fields for display.
+
+    The parsers leave holdings with raw usd_price/usd_value/usd_invested/
+    usd_gain; converting the whole batch through one NumPy multiply+round
+    replaces four scalar multiply-and-round calls per holding.
+    """
+    if not holdings:
+        return
+
+    arr = np.array(
+        [[h['usd_price'], h['usd_value'], h['usd_invested'], h['usd_gain']] for h in holdings],
+        dtype=np.float64,
+    )
+    inr = np.round(arr * USD_TO_INR, 2).tolist()
+    usd = np.round(arr, 2).tolist()
+
+    for holding, inr_row, usd_row in zip(holdings, inr, usd):
+        holding['nav'], holding['current_value'], holding['invested_amount'], holding['absolute_return'] = inr_row
+        holding['usd_price'], holding['usd_value'], holding['usd_invested'], holding['usd_gain'] = usd_row
+
+
+def _parse_page(pdf_path: str, page_index: int) -> tuple:
+    """Pool worker: open the document and parse a single page."""
+    doc = fitz.open(pdf_path)
+    try:
+        words = doc[page_index].get_text("words")
+    finally:
+        doc.close()
+    return _parse_page_words(words)
+
 
 def parse_us_equity_pdf(file_path: str) -> Dict[str, Any]:
     """
@@ -22,116 +189,77 @@ def parse_us_equity_pdf(file_path: str) -> Dict[str, Any]:
     """
     try:
         doc = fitz.open(file_path)
-        
+        page_count = doc.page_count
+
         holdings = []
         total_value = 0.0
         total_invested = 0.0
         account_name = ""
-        
-        # Get all text from PDF
-        all_text = ""
-        for page in doc:
-            all_text += page.get_text() + "\n"
-        
-        # Extract account name
-        name_match = re.search(r'Account Name[:\s]*([A-Za-z\s]+?)(?:\n|Account)', all_text)
-        if name_match:
-            account_name = name_match.group(1).strip()
-        
-        logger.info(f"Account name: {account_name}")
-        
+
         # Find the Holdings/Equity section
         # Pattern to match stock rows:
         # Description (with spaces) | Symbol | Quantity | Unit Cost | Total Cost | Market Price | Market Value | Gain/(Loss) | A/C Type
-        
-        # First, let's try to find the data using a different approach - 
-        # extract tables properly using layout analysis
-        
-        for page_num, page in enumerate(doc):
-            # Get text with layout preservation
-            blocks = page.get_text("dict")["blocks"]
-            
-            # Try to find table-like structures
-            lines = []
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text = ""
-                        for span in line["spans"]:
-                            line_text += span["text"] + " "
-                        lines.append(line_text.strip())
-            
-            logger.info(f"Page {page_num + 1}: {len(lines)} text lines")
-        
-        # Alternative: Parse using word positions
-        for page_num, page in enumerate(doc):
-            words = page.get_text("words")  # Returns list of (x0, y0, x1, y1, word, block_no, line_no, word_no)
-            
-            if not words:
-                continue
-            
-            # Group words by y-position (same line)
-            lines_by_y = {}
-            for word in words:
-                y = round(word[1] / 5) * 5  # Round to nearest 5 pixels
-                if y not in lines_by_y:
-                    lines_by_y[y] = []
-                lines_by_y[y].append((word[0], word[4]))  # (x position, text)
-            
-            # Sort each line by x position
-            for y in lines_by_y:
-                lines_by_y[y].sort(key=lambda x: x[0])
-            
-            # Process lines looking for stock data
-            sorted_ys = sorted(lines_by_y.keys())
-            
-            in_holdings_section = False
-            
-            for y in sorted_ys:
-                line_words = [w[1] for w in lines_by_y[y]]
-                line_text = " ".join(line_words)
-                
-                # Check if we're entering holdings section
-                if "HOLDINGS" in line_text.upper() or "Equity" in line_text:
-                    in_holdings_section = True
-                    continue
-                
-                if "ACTIVITY" in line_text.upper():
-                    in_holdings_section = False
-                    continue
-                
-                if not in_holdings_section:
-                    continue
-                
-                # Try to parse as a stock row
-                # Look for patterns like: STOCK NAME ... SYMBOL NUMBER NUMBER NUMBER ...
-                holding = try_parse_stock_line(line_words, lines_by_y[y])
-                
-                if holding:
-                    holdings.append(holding)
-                    # Use original USD values for totals
-                    total_value += holding.get('usd_value', 0)
-                    total_invested += holding.get('usd_invested', 0)
-                    logger.info(f"Found: {holding['symbol']} - ${holding.get('usd_value', 0)}")
-        
-        doc.close()
-        
-        # If no holdings found with word-based parsing, try regex on full text
+
+        # Pages are independent (section state resets per page), so larger
+        # statements are parsed in parallel with one worker per page; each
+        # worker opens its own document handle since fitz objects don't
+        # pickle. Serial parsing stays as the fallback.
+        results = None
+        if page_count >= _PARALLEL_PAGE_MIN:
+            doc.close()
+            try:
+                with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    results = list(executor.map(partial(_parse_page, file_path), range(page_count)))
+            except Exception as exc:
+                logger.warning(f"Parallel page parsing failed, falling back to serial: {exc}")
+                results = None
+            if results is None:
+                doc = fitz.open(file_path)
+
+        if results is None:
+            results = [_parse_page_words(page.get_text("words")) for page in doc]
+            doc.close()
+
+        text_lines = []
+        for page_holdings, page_lines in results:
+            for holding in page_holdings:
+                holdings.append(holding)
+                # Use original USD values for totals
+                total_value += holding.get('usd_value', 0)
+                total_invested += holding.get('usd_invested', 0)
+            text_lines.extend(page_lines)
+
+        # Extract account name straight from the line list; the pattern
+        # needs its line terminator back, but this avoids joining the whole
+        # document's text on the common successful path
+        for line_text in text_lines:
+            if 'Account Name' in line_text:
+                name_match = _ACCOUNT_NAME_RE.search(line_text + '\n')
+                if name_match:
+                    account_name = name_match.group(1).strip()
+                break
+
+        logger.info(f"Account name: {account_name}")
+
+        # If no holdings found with word-based parsing, try regex on full
+        # text — the joined text is only materialized for this fallback
         if not holdings:
             logger.info("Trying regex-based parsing...")
-            holdings, total_value, total_invested = parse_with_regex(all_text)
-        
+            holdings, total_value, total_invested = parse_with_regex("\n".join(text_lines))
+
+        _convert_holdings_to_inr(holdings)
+
         # Sort by value
         holdings.sort(key=lambda x: x['current_value'], reverse=True)
         
         # Convert totals to INR
-        total_value_inr = total_value * USD_TO_INR
-        total_invested_inr = total_invested * USD_TO_INR
-        total_return_inr = total_value_inr - total_invested_inr
+        total_value_inr = _to_inr(total_value)
+        total_invested_inr = _to_inr(total_invested)
+        total_return_inr = _to_inr(total_value - total_invested)
         return_pct = (total_return_inr / total_invested_inr * 100) if total_invested_inr > 0 else 0
-        
+
         logger.info(f"Parsed {len(holdings)} US equity holdings, Total: ${total_value:.2f} (₹{total_value_inr:.2f})")
-        
+
         return {
             "investor": {
                 "name": account_name,
@@ -139,9 +267,9 @@ def parse_us_equity_pdf(file_path: str) -> Dict[str, Any]:
                 "mobile": "",
             },
             "summary": {
-                "total_value": round(total_value_inr, 2),  # INR
-                "total_invested": round(total_invested_inr, 2),  # INR
-                "total_return": round(total_return_inr, 2),  # INR
+                "total_value": total_value_inr,  # INR
+                "total_invested": total_invested_inr,  # INR
+                "total_return": total_return_inr,  # INR
                 "return_percentage": round(return_pct, 2),
                 "scheme_count": len(holdings),
                 "folio_count": 1,
@@ -153,7 +281,7 @@ def parse_us_equity_pdf(file_path: str) -> Dict[str, Any]:
             "asset_allocation": [
                 {
                     "asset_class": "US Equity",
-                    "value": round(total_value_inr, 2),  # INR
+                    "value": total_value_inr,  # INR
                     "percentage": 100.0,
                     "scheme_count": len(holdings)
                 }
@@ -161,7 +289,7 @@ def parse_us_equity_pdf(file_path: str) -> Dict[str, Any]:
             "amc_allocation": [
                 {
                     "amc": "Vested",
-                    "value": round(total_value_inr, 2),  # INR
+                    "value": total_value_inr,  # INR
                     "percentage": 100.0,
                     "scheme_count": len(holdings)
                 }
@@ -185,13 +313,21 @@ def try_parse_stock_line(words: List[str], word_positions: List[tuple]) -> Optio
     # Look for a stock symbol (2-5 uppercase letters)
     symbol = None
     symbol_idx = -1
-    
+    suffix_numbers = None
+
     for i, word in enumerate(words):
         # Stock symbols are typically 1-5 uppercase letters
-        if re.match(r'^[A-Z]{1,5}$', word) and word not in ['COM', 'INC', 'ETF', 'TR', 'CLASS', 'CL', 'A', 'B', 'C', 'NEW', 'DEL']:
-            # Check if followed by numbers (quantity, prices)
-            numbers_after = sum(1 for w in words[i+1:] if is_number(w))
-            if numbers_after >= 3:
+        if 1 <= len(word) <= 5 and word.isalpha() and word.isupper() and word not in _SYMBOL_STOPWORDS:
+            # Check if followed by numbers (quantity, prices). The numeric
+            # words are counted once with a suffix sum on the first
+            # candidate, so each further candidate checks its tail in O(1)
+            # instead of rescanning it.
+            if suffix_numbers is None:
+                n = len(words)
+                suffix_numbers = [0] * (n + 1)
+                for j in range(n - 1, -1, -1):
+                    suffix_numbers[j] = suffix_numbers[j + 1] + (1 if is_number(words[j]) else 0)
+            if suffix_numbers[i + 1] >= 3:
                 symbol = word
                 symbol_idx = i
                 break
@@ -225,8 +361,9 @@ def try_parse_stock_line(words: List[str], word_positions: List[tuple]) -> Optio
     
     pct_return = (gain_loss / total_cost * 100) if total_cost > 0 else 0
     clean_name = clean_description(description, symbol)
-    
-    # Convert USD to INR
+
+    # Raw USD values only; the INR fields are filled in bulk by
+    # _convert_holdings_to_inr once all holdings are collected
     return {
         "folio": "Vested",
         "amc": "Vested",
@@ -234,106 +371,110 @@ def try_parse_stock_line(words: List[str], word_positions: List[tuple]) -> Optio
         "isin": "",
         "symbol": symbol,
         "units": round(quantity, 6),
-        "nav": round(market_price * USD_TO_INR, 2),  # Convert to INR
-        "current_value": round(market_value * USD_TO_INR, 2),  # Convert to INR
-        "invested_amount": round(total_cost * USD_TO_INR, 2),  # Convert to INR
-        "absolute_return": round(gain_loss * USD_TO_INR, 2),  # Convert to INR
         "percentage_return": round(pct_return, 2),  # Percentage stays same
         "asset_class": "us_equity",
         "valuation_date": "",
         "currency": "USD",  # Original currency marker
-        "usd_value": round(market_value, 2),  # Keep original USD value
-        "usd_invested": round(total_cost, 2),  # Keep original USD invested
+        "usd_price": market_price,
+        "usd_value": market_value,
+        "usd_invested": total_cost,
+        "usd_gain": gain_loss,
     }
 
 
+# Known US stock symbols and their names, for the regex fallback parser
+_KNOWN_STOCKS = {
+    'AAPL': 'Apple Inc',
+    'AMZN': 'Amazon',
+    'ARKK': 'ARK Innovation ETF',
+    'BRK.B': 'Berkshire Hathaway',
+    'FIG': 'Figma Inc',
+    'GOOGL': 'Alphabet (Google)',
+    'ITA': 'iShares US Aerospace & Defense ETF',
+    'JPM': 'JPMorgan Chase',
+    'META': 'Meta (Facebook)',
+    'METV': 'Roundhill Ball Metaverse ETF',
+    'MSFT': 'Microsoft',
+    'SHOP': 'Shopify',
+    'SOXX': 'iShares Semiconductor ETF',
+    'XYZ': 'Block Inc',
+    'TSLA': 'Tesla',
+    'NVDA': 'NVIDIA',
+    'NFLX': 'Netflix',
+    'DIS': 'Disney',
+    'V': 'Visa',
+    'MA': 'Mastercard',
+    'DWBS': 'DW Bank Sweep',
+}
+
+_KNOWN_SYMBOLS = frozenset(_KNOWN_STOCKS)
+
+# Full stock row in one pattern: an alternation of every known symbol
+# (longest first, so e.g. METV isn't shadowed by META) followed by its
+# run of numeric tokens. The tail's \s+ spans newlines, covering rows
+# that wrap onto the next line.
+_ROW_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(s) for s in sorted(_KNOWN_STOCKS, key=len, reverse=True)) + r')\b'
+    r'((?:\s+[$()\-\d.,]+){4,7})',
+    re.IGNORECASE,
+)
+
+
 def parse_with_regex(text: str) -> tuple:
     """Parse holdings using regex patterns."""
     holdings = []
+    seen_symbols = set()
     total_value = 0.0
     total_invested = 0.0
-    
-    # Known US stock symbols and their names
-    known_stocks = {
-        'AAPL': 'Apple Inc',
-        'AMZN': 'Amazon',
-        'ARKK': 'ARK Innovation ETF',
-        'BRK.B': 'Berkshire Hathaway',
-        'FIG': 'Figma Inc',
-        'GOOGL': 'Alphabet (Google)',
-        'ITA': 'iShares US Aerospace & Defense ETF',
-        'JPM': 'JPMorgan Chase',
-        'META': 'Meta (Facebook)',
-        'METV': 'Roundhill Ball Metaverse ETF',
-        'MSFT': 'Microsoft',
-        'SHOP': 'Shopify',
-        'SOXX': 'iShares Semiconductor ETF',
-        'XYZ': 'Block Inc',
-        'TSLA': 'Tesla',
-        'NVDA': 'NVIDIA',
-        'NFLX': 'Netflix',
-        'DIS': 'Disney',
-        'V': 'Visa',
-        'MA': 'Mastercard',
-        'DWBS': 'DW Bank Sweep',
-    }
-    
-    # Pattern to find stock rows - look for symbol followed by numbers
-    # Format: SYMBOL followed by quantity, unit cost, total cost, market price, market value, gain/loss
-    
-    lines = text.split('\n')
-    
-    for i, line in enumerate(lines):
-        # Try to find known symbols in the line
-        for symbol, name in known_stocks.items():
-            if symbol in line.upper().split():
-                # Try to extract numbers from this line and nearby lines
-                combined = line
-                if i + 1 < len(lines):
-                    combined += " " + lines[i + 1]
-                
-                numbers = extract_numbers(combined)
-                
-                if len(numbers) >= 5:
-                    quantity = numbers[0]
-                    unit_cost = numbers[1]
-                    total_cost = numbers[2]
-                    market_price = numbers[3]
-                    market_value = numbers[4]
-                    gain_loss = numbers[5] if len(numbers) > 5 else (market_value - total_cost)
-                    
-                        # Validate - market value should be positive and reasonable
-                    if market_value > 0 and quantity > 0:
-                        pct_return = (gain_loss / total_cost * 100) if total_cost > 0 else 0
-                        
-                        # Convert USD to INR
-                        holding = {
-                            "folio": "Vested",
-                            "amc": "Vested",
-                            "scheme_name": name,
-                            "isin": "",
-                            "symbol": symbol,
-                            "units": round(quantity, 6),
-                            "nav": round(market_price * USD_TO_INR, 2),  # Convert to INR
-                            "current_value": round(market_value * USD_TO_INR, 2),  # Convert to INR
-                            "invested_amount": round(total_cost * USD_TO_INR, 2),  # Convert to INR
-                            "absolute_return": round(gain_loss * USD_TO_INR, 2),  # Convert to INR
-                            "percentage_return": round(pct_return, 2),  # Percentage stays same
-                            "asset_class": "us_equity",
-                            "valuation_date": "",
-                            "currency": "USD",  # Original currency marker
-                            "usd_value": round(market_value, 2),  # Keep original USD value
-                            "usd_invested": round(total_cost, 2),  # Keep original USD invested
-                        }
-                        
-                        # Avoid duplicates
-                        if not any(h['symbol'] == symbol for h in holdings):
-                            holdings.append(holding)
-                            total_value += market_value
-                            total_invested += total_cost
-                            logger.info(f"Regex found: {symbol} - ${market_value}")
-                        break
-    
+
+    # One linear scan of the whole text: each match captures a known
+    # symbol plus its numeric tail atomically, replacing the per-line
+    # per-symbol double loop
+    for match in _ROW_RE.finditer(text):
+        symbol = match.group(1).upper()
+        if symbol in seen_symbols:
+            continue
+        name = _KNOWN_STOCKS[symbol]
+
+        numbers = extract_numbers(match.group(2))
+
+        if len(numbers) >= 5:
+            quantity = numbers[0]
+            unit_cost = numbers[1]
+            total_cost = numbers[2]
+            market_price = numbers[3]
+            market_value = numbers[4]
+            gain_loss = numbers[5] if len(numbers) > 5 else (market_value - total_cost)
+
+            # Validate - market value should be positive and reasonable
+            if market_value > 0 and quantity > 0:
+                pct_return = (gain_loss / total_cost * 100) if total_cost > 0 else 0
+
+                # Raw USD values only; INR fields are filled in bulk later
+                holding = {
+                    "folio": "Vested",
+                    "amc": "Vested",
+                    "scheme_name": name,
+                    "isin": "",
+                    "symbol": symbol,
+                    "units": round(quantity, 6),
+                    "percentage_return": round(pct_return, 2),  # Percentage stays same
+                    "asset_class": "us_equity",
+                    "valuation_date": "",
+                    "currency": "USD",  # Original currency marker
+                    "usd_price": market_price,
+                    "usd_value": market_value,
+                    "usd_invested": total_cost,
+                    "usd_gain": gain_loss,
+                }
+
+                # Avoid duplicates
+                seen_symbols.add(symbol)
+                holdings.append(holding)
+                total_value += market_value
+                total_invested += total_cost
+                logger.info(f"Regex found: {symbol} - ${market_value}")
+
     return holdings, total_value, total_invested
 
 
@@ -341,9 +482,7 @@ def extract_numbers(text: str) -> List[float]:
     """Extract all numbers from text."""
     numbers = []
     # Match numbers including decimals and negative (with parentheses)
-    pattern = r'[\d,]+\.?\d*|\([\d,]+\.?\d*\)'
-    
-    for match in re.findall(pattern, text):
+    for match in _findall_numbers(text):
         num = parse_number(match)
         if num is not None and num != 0:
             numbers.append(num)
@@ -353,7 +492,7 @@ def extract_numbers(text: str) -> List[float]:
 
 def is_number(s: str) -> bool:
     """Check if string is a number."""
-    s = s.replace(',', '').replace('$', '')
+    s = s.translate(_NUMBER_STRIP)
     if s.startswith('(') and s.endswith(')'):
         s = s[1:-1]
     try:
@@ -368,9 +507,9 @@ def parse_number(value: str) -> Optional[float]:
     if not value:
         return None
     
-    # Remove currency symbols and commas
-    value = str(value).replace('$', '').replace(',', '').strip()
-    
+    # Remove currency symbols, commas and whitespace in one pass
+    value = str(value).translate(_NUMBER_STRIP)
+
     # Handle parentheses for negative numbers
     if value.startswith('(') and value.endswith(')'):
         value = '-' + value[1:-1]
@@ -429,16 +568,34 @@ def is_us_equity_pdf(file_path: str) -> bool:
             logger.info(f"US Equity PDF detected via filename pattern: {filename}")
             return True
         
+        # ============ CHEAP BYTE-LEVEL SCAN BEFORE OPENING WITH MUPDF ============
+        # Broker/depository markers often survive uncompressed in metadata
+        # and info streams; scanning the first 64KB of raw bytes is a memory-
+        # speed substring search, far cheaper than MuPDF parsing. Only a
+        # definitive hit short-circuits — compressed streams fall through to
+        # the text extraction below.
+        with open(file_path, 'rb') as f:
+            head = f.read(65536).lower()
+
+        if b'vf securities' in head or b'drivewealth' in head:
+            logger.info("US Equity PDF detected via byte-level scan")
+            return True
+
+        if b'nsdl' in head and b'cdsl' in head:
+            logger.info("Indian CAS PDF detected via byte-level scan, NOT US equity")
+            return False
+
         # ============ NOW CHECK TEXT CONTENT ============
         doc = fitz.open(file_path)
         
         # Get text from first few pages (enough for detection)
-        all_text = ""
+        parts = []
         for i, page in enumerate(doc):
             if i >= 3:  # Only check first 3 pages for detection
                 break
-            all_text += page.get_text().lower() + " "
+            parts.append(page.get_text().lower())
         doc.close()
+        all_text = " ".join(parts)
         
         # Definitive US equity indicators - these are unique to US brokerage statements
         definitive_us_indicators = [
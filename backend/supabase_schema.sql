@@ -20,12 +20,21 @@ CREATE TABLE IF NOT EXISTS portfolios (
     phone VARCHAR(15) NOT NULL,
     filename VARCHAR(255),
     uploaded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    portfolio_data TEXT  -- JSON stored as text
+    portfolio_data JSONB  -- native JSONB: partial updates via jsonb_set, no text parse on read
 );
 
+-- Migration for deployments created before portfolio_data became JSONB
+-- (init_db/create_all never alters existing tables):
+-- ALTER TABLE portfolios ALTER COLUMN portfolio_data TYPE jsonb USING portfolio_data::jsonb;
+
 -- Create index for user portfolio lookups
 CREATE INDEX IF NOT EXISTS idx_portfolios_phone ON portfolios(phone);
 
+-- Covering indexes for the hot lookups: newest-portfolio-per-user and
+-- per-user filename checks (match ix_* definitions on the model)
+CREATE INDEX IF NOT EXISTS ix_portfolios_phone_uploaded ON portfolios(phone, uploaded_at DESC);
+CREATE INDEX IF NOT EXISTS ix_portfolios_phone_filename ON portfolios(phone, filename);
+
 -- Enable Row Level Security (optional, for Supabase Auth integration)
 -- ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE portfolios ENABLE ROW LEVEL SECURITY;